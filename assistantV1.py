@@ -7,25 +7,30 @@ Easy-to-Use API: Offers a consistent and simple interface for processing text, s
 Multi-Language Support: Provides a strong foundation for when we add local languages like Hindi.
 ML Integration: Designed to train custom machine learning models for specific tasks like understanding crop names or intents.
 import spacy'''
-import spacy 
-# Load the English language model
-nlp = spacy.load("en_core_web_sm")
+import numpy as np
+from spacy.attrs import POS
+from spacy.symbols import NOUN, PROPN
+from types import MappingProxyType
+from nlp_loader import get_tagger
+# Load the English language model (POS tagging only; shared via nlp_loader)
+nlp = get_tagger()
+
+# This is fake data for testing, keyed by (crop, location).
+# Built once at import time and read-only, so lookups never rebuild it.
+PRICES = MappingProxyType({
+    ("potato", "patna"): 25, ("potato", "delhi"): 30,
+    ("tomato", "patna"): 40, ("tomato", "delhi"): 55,
+    ("rice", "patna"): 20, ("rice", "delhi"): 25
+})
 
 # This is a mock function to simulate checking a database for a price.
 # In the real version, this will call an API.
 def get_crop_price(crop_name, location_name):
-    # This is fake data for testing.
-    prices = {
-        "potato": {"patna": 25, "delhi": 30},
-        "tomato": {"patna": 40, "delhi": 55},
-        "rice": {"patna": 20, "delhi": 25}
-    }
     # Try to get the price. Use .lower() to make it case-insensitive.
-    try:
-        price = prices[crop_name.lower()][location_name.lower()]
+    price = PRICES.get((crop_name.lower(), location_name.lower()))
+    if price is not None:
         return f"The price of {crop_name} in {location_name} is {price} rupees per kilo."
-    except KeyError:
-        return f"Sorry, I could not find the price for {crop_name} in {location_name}."
+    return f"Sorry, I could not find the price for {crop_name} in {location_name}."
 
 # Main program logic
 print("Hello! I am your agricultural assistant. How can I help you?")
@@ -40,13 +45,17 @@ doc = nlp(user_text)
 crop = None
 location = None
 
-for token in doc:
-    # Simple rule: if it's a common noun, it might be a crop.
-    if token.pos_ == "NOUN" and not crop:
-        crop = token.text
-    # If it's a proper noun, it might be a location.
-    if token.pos_ == "PROPN" and not location:
-        location = token.text
+# Read all POS tags as one NumPy array instead of asking each token for token.pos_
+pos_tags = doc.to_array(POS)
+nouns = np.flatnonzero(pos_tags == NOUN)
+proper_nouns = np.flatnonzero(pos_tags == PROPN)
+
+# Simple rule: if it's a common noun, it might be a crop.
+if len(nouns):
+    crop = doc[int(nouns[0])].text
+# If it's a proper noun, it might be a location.
+if len(proper_nouns):
+    location = doc[int(proper_nouns[0])].text
 
 print(f"I think you asked about the crop: {crop}")
 print(f"I think you asked about the location: {location}")
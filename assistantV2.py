@@ -1,92 +1,99 @@
 # assistant_v2.py
 # Improved prototype using spaCy's Named Entity Recognition (NER)
 # Processes text input (simulates speech) for crop price queries.
-# Uses spaCy's NER to identify locations (GPE) and other entities.
-# Falls back to noun extraction if NER doesn't find crops.
+# Uses a rule-based spaCy EntityRuler to identify locations (GPE) and crops (CROP).
 # Provides debug output of recognized entities.
 # Queries mock database and generates spoken response.
 # Example: "price of tomato in patna" → "The price of tomato in patna is 40 rupees/kilo"
 
 import spacy
 import re
+import threading
+from types import MappingProxyType
+from nlp_loader import get_entity_ruler
 
-# Load the English language model
-nlp = spacy.load("en_core_web_sm")
+# Known crops and locations recognised by the entity ruler
+KNOWN_CROPS = ["tomato", "potato", "rice", "wheat", "corn", "onion"]
+KNOWN_LOCATIONS = ["patna", "delhi", "mumbai", "kolkata", "chennai"]
+
+# Queries only ever mention a handful of known crops and locations, so a rule-only
+# pipeline (blank English tokenizer + EntityRuler) replaces the statistical model.
+# It is built lazily, and shared with other assistants, by nlp_loader.
+def get_nlp():
+    """Build the rule-based pipeline on first use and return the shared instance"""
+    return get_entity_ruler(KNOWN_CROPS, KNOWN_LOCATIONS)
+
+# Print the entities found in each query
+DEBUG = True
+
+# Descriptions of the entity labels, looked up once instead of per entity
+LABEL_EXPLAIN = {"GPE": spacy.explain("GPE"), "CROP": "Known crop name"}
+
+# Pre-compiled misspelling correction used by preprocess()
+_PICE_RE = re.compile(r'\bpice\b')
+
+# Mock price data keyed by (crop, location), built once and read-only
+PRICES = MappingProxyType({
+    ("potato", "patna"): 25, ("potato", "delhi"): 30,
+    ("tomato", "patna"): 40, ("tomato", "delhi"): 55,
+    ("rice", "patna"): 20, ("rice", "delhi"): 25
+})
 
 # Mock function to get price
 def get_crop_price(crop_name, location_name):
-    prices = {
-        "potato": {"patna": 25, "delhi": 30},
-        "tomato": {"patna": 40, "delhi": 55},
-        "rice": {"patna": 20, "delhi": 25}
-    }
-    try:
-        price = prices[crop_name.lower()][location_name.lower()]
+    price = PRICES.get((crop_name.lower(), location_name.lower()))
+    if price is not None:
         return f"The price of {crop_name} in {location_name} is {price} rupees per kilo."
-    except KeyError:
-        return f"Sorry, I could not find the price for {crop_name} in {location_name}."
+    return f"Sorry, I could not find the price for {crop_name} in {location_name}."
+
+def preprocess(user_text):
+    """Correct common misspellings and normalize case"""
+    user_text = user_text.lower()
+    return _PICE_RE.sub('price', user_text)  # Correct common misspelling
+
+def answer(doc):
+    """Find the crop and location in a processed query and print the answer"""
+    # Initialize variables
+    crop = None
+    location = None
+
+    # Use the entities tagged by the entity ruler
+    if DEBUG:
+        print("\n--- Debug: Entities found by spaCy ---")
+    for ent in doc.ents:
+        if DEBUG:
+            print(f"Text: {ent.text}, Label: {ent.label_} ({LABEL_EXPLAIN.get(ent.label_)})")
+        # If the entity is a Geopolitical Entity (city, state, country), it's our location.
+        if ent.label_ == "GPE":
+            location = ent.text
+        # Otherwise it's a CROP entity; keep the first one
+        elif not crop:
+            crop = ent.text
+
+    # DEFAULT: If no location is provided, use a default based on our user persona
+    if not location:
+        location = "Patna"  # Default to the main market for our user, Anil
+        print(f"Using default location for your area: {location}")
+
+    print(f"\nI think you asked about the crop: {crop}")
+    print(f"I think you asked about the location: {location}")
+
+    if crop and location:
+        response = get_crop_price(crop, location)
+        print("\nAssistant:", response)
+    else:
+        print("\nSorry, I didn't understand. Please mention both a crop and a location, like 'price of potato in Patna'.")
+
+def handle(texts):
+    """Answer a batch of queries, running spaCy over them with nlp.pipe"""
+    # Waits here if the pipeline is still being built
+    nlp = get_nlp()
+    for doc in nlp.pipe((preprocess(text) for text in texts), batch_size=32):
+        answer(doc)
 
 print("Hello! I am your agricultural assistant. How can I help you?")
+# Start building the pipeline in the background while the user is typing
+threading.Thread(target=get_nlp, daemon=True).start()
 user_text = input("Please type your question: ")
 
-# Preprocess text: correct common misspellings and normalize case
-user_text = user_text.lower()
-user_text = re.sub(r'\bpice\b', 'price', user_text)  # Correct common misspelling
-
-# Process the user's text with spaCy
-doc = nlp(user_text)
-
-# Initialize variables
-crop = None
-location = None
-
-# Use Named Entity Recognition (NER)
-print("\n--- Debug: Entities found by spaCy ---")
-for ent in doc.ents:
-    print(f"Text: {ent.text}, Label: {ent.label_} ({spacy.explain(ent.label_)})")
-    # If the entity is a Geopolitical Entity (city, state, country), it's our location.
-    if ent.label_ == "GPE":
-        location = ent.text
-    # For other entities, assume they might be the crop if we haven't found one yet
-    elif not crop:
-        crop = ent.text
-
-# FALLBACK: Smarter crop identification if NER didn't find one
-if not crop:
-    # Create a list of potential crops from the document's nouns
-    potential_crops = [token.text for token in doc if token.pos_ == "NOUN"]
-    
-    # Define a list of known crops to check against
-    known_crops = ["tomato", "potato", "rice", "wheat", "corn", "onion"]
-    
-    # Look for any noun that is in our list of known crops
-    for word in potential_crops:
-        if word.lower() in known_crops:
-            crop = word
-            break
-    
-    # If no known crop is found, use the last noun instead of the first
-    if not crop and potential_crops:
-        crop = potential_crops[-1]
-
-# FALLBACK: If NER didn't find a location, look for known locations in the text
-if not location:
-    known_locations = ["patna", "delhi", "mumbai", "kolkata", "chennai"]
-    for token in doc:
-        if token.text.lower() in known_locations:
-            location = token.text
-            break
-
-# DEFAULT: If no location is provided, use a default based on our user persona
-if not location:
-    location = "Patna"  # Default to the main market for our user, Anil
-    print(f"Using default location for your area: {location}")
-
-print(f"\nI think you asked about the crop: {crop}")
-print(f"I think you asked about the location: {location}")
-
-if crop and location:
-    response = get_crop_price(crop, location)
-    print("\nAssistant:", response)
-else:
-    print("\nSorry, I didn't understand. Please mention both a crop and a location, like 'price of potato in Patna'.")
\ No newline at end of file
+handle([user_text])
@@ -23,69 +23,162 @@ Responses are converted to speech using TTS'''
 
 import speech_recognition as sr
 import pyttsx3
+import json
+import os
+import queue
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
+
+# Vosk is optional: without it (or its model) speech goes to Google's web API
+try:
+    from vosk import Model, KaldiRecognizer
+except ImportError:
+    Model = None
+
+# Small offline English speech model, downloaded from https://alphacephei.com/vosk/models
+VOSK_MODEL_PATH = "models/vosk-model-small-en-in-0.4"
+VOSK_SAMPLE_RATE = 16000
+
+# Whole-query commands that end the session (frozenset: one hash probe per query)
+EXIT_WORDS = frozenset(['exit', 'quit', 'stop'])
+
+# Intent keywords checked by classify_intent, in priority order
+INTENT_KEYWORDS = [
+    ("get_price", ['price', 'cost', 'rate', 'bhav']),
+    ("get_weather", ['weather', 'rain', 'temperature']),
+    ("get_advice", ['disease', 'pest', 'problem', 'advice'])
+]
+
+# Entity keywords recognised by extract_entities
+CROPS = ['wheat', 'rice', 'tomato', 'potato']
+LOCATIONS = ['patna', 'delhi']
+
+# Bit flags for the entity kinds, combined into a found-mask by scan_query
+CROP_FOUND = 0b01
+LOCATION_FOUND = 0b10
+ALL_FOUND = CROP_FOUND | LOCATION_FOUND
+INTENT_KEYWORD = 0b100
+
+# Mock databases - replace with actual APIs.
+# Built once at import time and read-only, so lookups never rebuild them.
+# Keys are the lowercase names from CROPS/LOCATIONS, exactly as scan_query returns them.
+PRICE_DATA = MappingProxyType({
+    ("wheat", "patna"): "₹2,100 per quintal", ("wheat", "delhi"): "₹2,250 per quintal",
+    ("rice", "patna"): "₹3,000 per quintal", ("rice", "delhi"): "₹3,200 per quintal"
+})
+
+WEATHER_DATA = MappingProxyType({
+    "patna": "Sunny, 32°C",
+    "delhi": "Partly cloudy, 35°C"
+})
+
+ADVICE_DATA = MappingProxyType({
+    "tomato": "Ensure proper drainage and rotate crops to prevent diseases.",
+    "potato": "Plant in well-drained soil and maintain consistent moisture."
+})
 
 class AgriculturalAssistant:
     def __init__(self):
         self.recognizer = sr.Recognizer()
-        self.tts_engine = pyttsx3.init()
+        self.speech_model = self.load_speech_model()
         
-    def classify_intent(self, text):
-        """Classify user intent from text input"""
-        text = text.lower()
-        if any(word in text for word in ['price', 'cost', 'rate', 'bhav']):
-            return "get_price"
-        elif any(word in text for word in ['weather', 'rain', 'temperature']):
-            return "get_weather"
-        elif any(word in text for word in ['disease', 'pest', 'problem', 'advice']):
-            return "get_advice"
-        else:
-            return "unknown"
-
-    def get_crop_price(self, crop, location):
-        """Get crop price information (mock data)"""
-        # Mock price database - replace with actual API
-        price_data = {
-            "wheat": {"patna": "₹2,100 per quintal", "delhi": "₹2,250 per quintal"},
-            "rice": {"patna": "₹3,000 per quintal", "delhi": "₹3,200 per quintal"}
-        }
+        # Speech runs on a single worker thread so the main loop never waits on it. Some TTS
+        # drivers (SAPI5, NSSpeechSynthesizer) only work on the thread that created the engine,
+        # so the worker creates it; speaking a blank phrase now warms up the audio driver off
+        # the request path
+        self.tts_engine = None
+        self.tts_executor = ThreadPoolExecutor(max_workers=1, initializer=self._init_tts)
+        self.speech = self.tts_executor.submit(self._speak, " ")
+        
+        # Responses depend only on the lowercased query (the data is static), so repeated
+        # queries are answered from this cache; call answer_query.cache_clear() if the data changes
+        self.answer_query = lru_cache(maxsize=512)(self._answer_query)
         
-        crop = crop.lower()
-        location = location.lower()
+        # Compile every intent and entity keyword into one pattern so a query is scanned once
+        # (longest keywords first so overlapping words match in full, e.g. "price" not "rice")
+        self.keyword_tags = {}
+        for rank, (intent, keywords) in enumerate(INTENT_KEYWORDS):
+            for keyword in keywords:
+                self.keyword_tags[keyword] = (INTENT_KEYWORD, rank)
+        self.keyword_tags.update({crop: (CROP_FOUND, crop) for crop in CROPS})
+        self.keyword_tags.update({location: (LOCATION_FOUND, location) for location in LOCATIONS})
+        keywords = sorted(self.keyword_tags, key=len, reverse=True)
+        self.keyword_pattern = re.compile('|'.join(re.escape(k) for k in keywords))
         
-        if crop in price_data and location in price_data[crop]:
-            return f"The current price of {crop} in {location} is {price_data[crop][location]}"
+    def scan_query(self, lowered):
+        """Classify intent and extract crop and location in one pass over lowercased text"""
+        found = 0
+        entities = {}
+        intent_rank = len(INTENT_KEYWORDS)
+        
+        for match in self.keyword_pattern.finditer(lowered):
+            kind, value = self.keyword_tags[match.group()]
+            if kind == INTENT_KEYWORD:
+                intent_rank = min(intent_rank, value)
+            elif not found & kind:
+                found |= kind
+                entities[kind] = value
+            # Nothing later in the text can change the result
+            if found == ALL_FOUND and intent_rank == 0:
+                break
+        
+        intent = INTENT_KEYWORDS[intent_rank][0] if intent_rank < len(INTENT_KEYWORDS) else "unknown"
+        return intent, entities.get(CROP_FOUND), entities.get(LOCATION_FOUND)
+
+    def classify_intent(self, lowered):
+        """Classify user intent from already-lowercased text input"""
+        return self.scan_query(lowered)[0]
+
+    def get_crop_price(self, crop, location):
+        """Get crop price information (mock data) for names as returned by scan_query"""
+        price = PRICE_DATA.get((crop, location))
+        if price is not None:
+            return f"The current price of {crop} in {location} is {price}"
         else:
             return f"Sorry, I don't have price information for {crop} in {location}"
 
     def get_weather_info(self, location):
-        """Get weather information (mock data)"""
-        # Mock weather data - replace with actual API
-        weather_data = {
-            "patna": "Sunny, 32°C",
-            "delhi": "Partly cloudy, 35°C"
-        }
-        location = location.lower()
-        return weather_data.get(location, "Weather information not available for this location")
+        """Get weather information (mock data) for a name as returned by scan_query"""
+        return WEATHER_DATA.get(location, "Weather information not available for this location")
 
     def get_agriculture_advice(self, crop):
-        """Get agricultural advice (mock data)"""
-        # Mock advice database - replace with actual API
-        advice_data = {
-            "tomato": "Ensure proper drainage and rotate crops to prevent diseases.",
-            "potato": "Plant in well-drained soil and maintain consistent moisture."
-        }
-        crop = crop.lower()
-        return advice_data.get(crop, "No specific advice available for this crop")
+        """Get agricultural advice (mock data) for a name as returned by scan_query"""
+        return ADVICE_DATA.get(crop, "No specific advice available for this crop")
+
+    def load_speech_model(self):
+        """Load the offline Vosk speech model if it is available"""
+        if Model is None or not os.path.exists(VOSK_MODEL_PATH):
+            print("Offline speech model not found. Using Google speech recognition")
+            return None
+        return Model(VOSK_MODEL_PATH)
+
+    def recognize_speech(self, audio):
+        """Convert captured audio to text, offline when possible"""
+        if self.speech_model is None:
+            return self.recognizer.recognize_google(audio)
+        
+        recognizer = KaldiRecognizer(self.speech_model, VOSK_SAMPLE_RATE)
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=VOSK_SAMPLE_RATE, convert_width=2))
+        text = json.loads(recognizer.FinalResult()).get("text", "")
+        if not text:
+            raise sr.UnknownValueError()
+        return text
 
     def listen_to_speech(self):
         """Capture and convert speech to text"""
+        # Don't record the assistant's own answer
+        self.wait_for_speech()
         try:
             with sr.Microphone() as source:
                 print("Listening...")
                 audio = self.recognizer.listen(source, timeout=5)
                 
-            text = self.recognizer.recognize_google(audio)
+            text = self.recognize_speech(audio)
             print(f"You said: {text}")
             return text
         except sr.UnknownValueError:
@@ -95,40 +188,67 @@ class AgriculturalAssistant:
         except sr.WaitTimeoutError:
             return "No speech detected."
 
+    def capture_audio(self, audio_queue):
+        """Keep capturing utterances from the microphone and queue them for recognition"""
+        with sr.Microphone() as source:
+            while True:
+                # Pause while an answer is being spoken, so it doesn't come back as a query
+                self.wait_for_speech()
+                speech = self.speech
+                try:
+                    audio = self.recognizer.listen(source, timeout=5)
+                except sr.WaitTimeoutError:
+                    continue
+                # Drop the utterance if the assistant started speaking while it was recorded
+                if self.speech is speech:
+                    audio_queue.put(audio)
+
+    def recognize_audio(self, audio_queue, text_queue):
+        """Recognize queued utterances and queue the transcripts for processing"""
+        while True:
+            audio = audio_queue.get()
+            try:
+                text_queue.put(self.recognize_speech(audio))
+            except sr.UnknownValueError:
+                print("Sorry, I didn't understand that.")
+            except sr.RequestError:
+                print("Sorry, speech service is unavailable.")
+
+    def _init_tts(self):
+        """Create the TTS engine on the worker thread that uses it"""
+        self.tts_engine = pyttsx3.init()
+
+    def _speak(self, text):
+        """Synthesize text on the TTS worker thread"""
+        self.tts_engine.say(text)
+        self.tts_engine.runAndWait()
+
     def speak_response(self, response):
-        """Convert text response to speech"""
+        """Convert text response to speech without blocking the caller"""
         print(f"Assistant: {response}")
-        self.tts_engine.say(response)
-        self.tts_engine.runAndWait()
+        self.speech = self.tts_executor.submit(self._speak, response)
 
-    def extract_entities(self, text):
-        """Extract crop and location from text (basic implementation)"""
-        text = text.lower()
-        crops = ['wheat', 'rice', 'tomato', 'potato']
-        locations = ['patna', 'delhi']
-        
-        found_crop = None
-        found_location = None
-        
-        for crop in crops:
-            if crop in text:
-                found_crop = crop
-                break
-                
-        for location in locations:
-            if location in text:
-                found_location = location
-                break
-                
-        return found_crop, found_location
+    def wait_for_speech(self):
+        """Block until everything queued for speech has been spoken"""
+        # Speech is spoken in order on one thread, so the latest utterance finishes last
+        wait([self.speech])
+
+    def extract_entities(self, lowered):
+        """Extract crop and location from already-lowercased text (basic implementation)"""
+        return self.scan_query(lowered)[1:]
 
     def process_query(self, text):
         """Process user query and generate response"""
-        if text.lower() in ['exit', 'quit', 'stop']:
+        # Lowercase once and share it between the helpers below
+        lowered = text.lower()
+        if lowered in EXIT_WORDS:
             return "exit"
-            
-        intent = self.classify_intent(text)
-        crop, location = self.extract_entities(text)
+        
+        return self.answer_query(lowered)
+
+    def _answer_query(self, lowered):
+        """Generate the response for a lowercased query (cached as answer_query)"""
+        intent, crop, location = self.scan_query(lowered)
         
         if intent == "get_price":
             if crop and location:
@@ -151,8 +271,8 @@ class AgriculturalAssistant:
     def run(self):
         """Main loop for the assistant"""
         print("Agricultural Voice Assistant v3.0 Started!")
-        print("Available crops: wheat, rice, tomato, potato")
-        print("Available locations: patna, delhi")
+        print(f"Available crops: {', '.join(CROPS)}")
+        print(f"Available locations: {', '.join(LOCATIONS)}")
         print("Press Enter to speak or type your query...")
         
         while True:
@@ -186,7 +306,50 @@ class AgriculturalAssistant:
             except Exception as e:
                 print(f"Error: {e}")
                 self.speak_response("Sorry, I encountered an error. Please try again.")
+        
+        # Let any queued speech finish before exiting
+        self.tts_executor.shutdown(wait=True)
+
+    def run_hands_free(self):
+        """Main loop driven only by voice, with each stage overlapping the others"""
+        print("Agricultural Voice Assistant v3.0 Started (hands-free)!")
+        print(f"Available crops: {', '.join(CROPS)}")
+        print(f"Available locations: {', '.join(LOCATIONS)}")
+        print("Speak your query, or say 'stop' to exit...")
+        
+        # Capture, recognition and query processing run as a pipeline: the microphone
+        # records the next utterance while the previous one is still being recognized,
+        # and responses are spoken on the TTS worker thread
+        audio_queue = queue.Queue()
+        text_queue = queue.Queue()
+        threading.Thread(target=self.capture_audio, args=(audio_queue,), daemon=True).start()
+        threading.Thread(target=self.recognize_audio, args=(audio_queue, text_queue), daemon=True).start()
+        
+        while True:
+            try:
+                user_text = text_queue.get()
+                print(f"You said: {user_text}")
+                
+                response = self.process_query(user_text)
+                
+                if response == "exit":
+                    break
+                    
+                self.speak_response(response)
+                
+            except KeyboardInterrupt:
+                print("\nGoodbye!")
+                break
+            except Exception as e:
+                print(f"Error: {e}")
+                self.speak_response("Sorry, I encountered an error. Please try again.")
+        
+        # Let any queued speech finish before exiting
+        self.tts_executor.shutdown(wait=True)
 
 if __name__ == "__main__":
     assistant = AgriculturalAssistant()
-    assistant.run()
\ No newline at end of file
+    if "--hands-free" in sys.argv:
+        assistant.run_hands_free()
+    else:
+        assistant.run()
\ No newline at end of file
@@ -2,7 +2,8 @@ import speech_recognition as sr
 import pyttsx3
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.preprocessing import normalize
 from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 import joblib
@@ -11,24 +12,547 @@ import json
 from datetime import datetime
 import re
 import os
+import queue
+import sys
+import threading
+import time
+import unicodedata
 import csv
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import cached_property, lru_cache
 import math
+from types import MappingProxyType
+
+# Intent keywords per language, in priority order (the first intent with a match wins)
+INTENT_KEYWORDS = {
+    'hindi': [
+        ("get_price", ['भाव', 'मूल्य', 'दर', 'कीमत', 'लागत', 'बाजार', 'मंडी', 'bhav', 'mulya', 'keemat', 'dar']),
+        ("get_weather", ['मौसम', 'बारिश', 'तापमान', 'वर्षा', 'गर्मी', 'सर्दी', 'आर्द्रता', 'mausam', 'barish', 'temperature', 'varsha']),
+        ("get_advice", ['रोग', 'कीट', 'समस्या', 'सलाह', 'उपाय', 'जानकारी', 'उपचार', 'बीमारी', 'rog', 'keet', 'samasya', 'salah', 'upay']),
+        ("greeting", ['नमस्ते', 'हैलो', 'हाय', 'कैसे', 'धन्यवाद', 'शुक्रिया', 'namaste', 'hello', 'hi', 'kaise', 'dhanyavad']),
+        ("get_variety_info", ['किस्म', 'प्रजाति', 'वैरायटी', 'बीज', 'kism', 'prajati', 'variety', 'beej']),
+        ("get_market_info", ['बाजार', 'मंडी', 'बिक्री', 'खरीद', 'bazaar', 'mandi', 'bikri', 'kharid'])
+    ],
+    'english': [
+        ("get_price", ['price', 'cost', 'rate', 'bhav', 'market', 'mandi']),
+        ("get_weather", ['weather', 'rain', 'temperature', 'forecast', 'humidity', 'hot', 'cold']),
+        ("get_advice", ['disease', 'pest', 'problem', 'advice', 'help', 'treatment', 'solution']),
+        ("greeting", ['hello', 'hi', 'hey', 'howdy', 'thanks', 'thank']),
+        ("get_variety_info", ['variety', 'type', 'seed', 'species']),
+        ("get_market_info", ['market', 'mandi', 'sell', 'buy'])
+    ]
+}
+
+# Conversation log: one row appended per turn, compacted to the last HISTORY_LIMIT turns on exit
+HISTORY_PATH = 'data/conversation_history.csv'
+HISTORY_FIELDS = ['timestamp', 'user_text', 'intent', 'response', 'language']
+HISTORY_LIMIT = 100
+# Intents of the last few turns, kept in memory for follow-up questions (the full log is disk-only)
+RECENT_INTENTS = 5
+
+# Spoken or typed words that end the session
+EXIT_WORDS = frozenset(['exit', 'quit', 'stop', 'बंद', 'रुको'])
+
+# Common Hindi words in Roman script, used by detect_language
+HINDI_ROMAN_WORDS = frozenset(['ka', 'ki', 'ke', 'mein', 'batao', 'kya', 'hai', 'hain',
+                               'chahiye', 'bhav', 'mausam', 'salah', 'rog', 'keet', 'samasya',
+                               'kichad', 'pani', 'baarish', 'garmi', 'sardi', 'kheti', 'kaise',
+                               'karen', 'kisan', 'fasal', 'bij', 'paudha', 'khad', 'paani'])
+
+# Deletes every Devanagari code point; text that shrinks under it contains Hindi script
+_DEVANAGARI_MAP = dict.fromkeys(range(0x0900, 0x0980))
+
+# Vectorizer and classifier saved together by train_model.py
+MODEL_BUNDLE_PATH = 'models/intent_bundle.joblib'
+
+# Mandi price columns stored as categories (few distinct values, repeated on every row) or float32
+MANDI_DTYPES = {
+    'State': 'category', 'District': 'category', 'Market': 'category',
+    'Commodity': 'category', 'Variety': 'category',
+    'Min Price': 'float32', 'Max Price': 'float32', 'Modal Price': 'float32'
+}
+# Rows parsed at a time, so memory while loading stays bounded as the price file grows
+MANDI_CHUNK_ROWS = 100_000
+# Column names in raw data.gov.in exports -> the names used here
+MANDI_COLUMNS = {
+    'Arrival_Date': 'Arrival Date',
+    'Min_x0020_Price': 'Min Price',
+    'Max_x0020_Price': 'Max Price',
+    'Modal_x0020_Price': 'Modal Price'
+}
+# Mandi price rows are indexed by these columns, lowercased once at load so queries
+# compare against the index instead of lowercasing columns
+MANDI_INDEX = ['Commodity', 'State', 'District', 'Market', 'Variety']
+
+# Crop names with their spellings, Hindi names and mandi commodity names (read-only;
+# the entity lookups are built from these maps once, in __init__)
+CROP_MAP = MappingProxyType({
+    'wheat': ('wheat', 'gehun', 'गेहूं', 'गेहूँ', 'sonalika', 'lokwan', 'deshi'),
+    'rice': ('rice', 'chawal', 'chaval', 'चावल', 'dhan', 'धान', 'paddy', 'paddy(dhan)(common)', 'paddy(dhan)(basmati)'),
+    'tomato': ('tomato', 'tamatar', 'टमाटर'),
+    'potato': ('potato', 'aloo', 'aalu', 'आलू', 'आलु'),
+    'tur': ('tur', 'arhar', 'red gram', 'अरहर', 'तूर', 'arhar (tur/red gram)(whole)', 'arhar dal(tur dal)'),
+    'gram': ('gram', 'chana', 'bengal gram', 'चना', 'चना दाल', 'bengal gram(gram)(whole)', 'kabuli chana(chickpeas-white)', 'bengal gram dal (chana dal)'),
+    'urd': ('urd', 'black gram', 'urad', 'उड़द', 'काला चना', 'black gram (urd beans)(whole)', 'black gram dal (urd dal)'),
+    'millet': ('millet', 'navane', 'foxtail millet', 'बाजरा', 'मिलेट', 'bajra(pearl millet/cumbu)'),
+    'jaggery': ('jaggery', 'gur', 'गुड़', 'जैगरी', 'gur(jaggery)'),
+    'cucumber': ('cucumber', 'kheera', 'cucumbar', 'खीरा', 'ककड़ी', 'cucumbar(kheera)'),
+    'chilli': ('chilli', 'mirchi', 'green chilli', 'मिर्च', 'हरी मिर्च', 'dry chillies'),
+    'lemon': ('lemon', 'nimbu', 'नींबू', 'लेमन', 'lime'),
+    'pumpkin': ('pumpkin', 'kaddu', 'कद्दू', 'पम्पकिन'),
+    'maize': ('maize', 'makka', 'मक्का', 'corn', 'मकई'),
+    'sugarcane': ('sugarcane', 'ganna', 'गन्ना'),
+    'onion': ('onion', 'pyaaz', 'प्याज'),
+    'ginger': ('ginger', 'adrak', 'अदरक', 'ginger(green)', 'ginger(dry)'),
+    'garlic': ('garlic', 'lahsun', 'लहसुन'),
+    'banana': ('banana', 'kela', 'केला', 'banana - green'),
+    'apple': ('apple', 'seb', 'सेब'),
+    'cabbage': ('cabbage', 'patta gobhi', 'पत्ता गोभी'),
+    'cauliflower': ('cauliflower', 'phool gobhi', 'फूल गोभी'),
+    'brinjal': ('brinjal', 'baingan', 'बैंगन', 'eggplant'),
+    'bhindi': ('bhindi', 'ladies finger', 'okra', 'भिंडी', 'bhindi(ladies finger)'),
+    'capsicum': ('capsicum', 'shimla mirch', 'शिमला मिर्च', 'chilly capsicum'),
+    'carrot': ('carrot', 'gajar', 'गाजर'),
+    'soyabean': ('soyabean', 'soyabeen', 'सोयाबीन'),
+    'mustard': ('mustard', 'sarson', 'सरसों', 'mustard oil'),
+    'sesame': ('sesamum(sesame,gingelly,til)', 'til', 'तिल', 'sesame'),
+    'cumin': ('cummin seed(jeera)', 'jeera', 'जीरा'),
+    'castor seed': ('castor seed',),
+    'cotton': ('cotton', 'kapas', 'कपास'),
+    'groundnut': ('groundnut', 'moongphali', 'मूंगफली', 'ground nut seed', 'groundnut pods (raw)'),
+    'jowar': ('jowar(sorghum)', 'jowar', 'sorghum', 'ज्वार'),
+    'guar': ('guar', 'gwar', 'ग्वार'),
+    'ajwan': ('ajwan', 'ajwain', 'अजवाइन'),
+    'coriander': ('coriander(leaves)', 'coriander', 'dhania', 'धनिया', 'corriander seed'),
+    'arecanut': ('arecanut(betelnut/supari)', 'supari', 'सुपारी'),
+    'coconut': ('coconut', 'nariyal', 'नारियल', 'copra'),
+    'papaya': ('papaya', 'papita', 'पपीता', 'papaya (raw)'),
+    'peas': ('peas wet', 'matar', 'मटर', 'green peas', 'peas cod', 'white peas', 'peas(dry)'),
+    'guava': ('guava', 'amrood', 'अमरूद'),
+    'pomegranate': ('pomegranate', 'anar', 'अनार'),
+    'raddish': ('raddish', 'mooli', 'मूली'),
+    'spinach': ('spinach', 'palak', 'पालक'),
+    'colacasia': ('colacasia', 'arbi', 'अरबी'),
+    'bitter gourd': ('bitter gourd', 'karela', 'करेला'),
+    'bottle gourd': ('bottle gourd', 'lauki', 'लौकी'),
+    'ridgeguard': ('ridgeguard(tori)', 'tori', 'तोरी'),
+    'snakeguard': ('snakeguard', 'chichinda', 'चिचिंडा'),
+    'wood': ('wood', 'lakdi', 'लकड़ी'),
+    'moong': ('green gram (moong)(whole)', 'moong', 'मूंग'),
+    'methi': ('methi seeds', 'methi', 'मेथी'),
+    'soanf': ('soanf', 'saunf', 'सौंफ'),
+    'drumstick': ('drumstick', 'sahjan', 'सहजन'),
+    'pear': ('pear(marasebu)', 'nashpati', 'नाशपाती'),
+    'grapes': ('grapes', 'angoor', 'अंगूर'),
+    'orange': ('orange', 'santara', 'संतरा'),
+    'pineapple': ('pineapple', 'ananas', 'अनानास'),
+    'watermelon': ('water melon', 'tarbooj', 'तरबूज'),
+    'tapioca': ('tapioca',),
+    'rubber': ('rubber',),
+    'pepper': ('black pepper', 'pepper ungarbled', 'kali mirch', 'काली मिर्च'),
+    'nutmeg': ('nutmeg', 'jaiphal', 'जायफल'),
+    'turmeric': ('turmeric', 'haldi', 'हल्दी'),
+    'barley': ('barley (jau)', 'jau', 'जौ'),
+    'ghee': ('ghee', 'घी'),
+    'lentil': ('lentil (masur)(whole)', 'masur dal', 'masoor', 'मसूर'),
+    'parval': ('pointed gourd (parval)', 'parval', 'परवल'),
+    'sweet lime': ('mousambi(sweet lime)', 'mosambi', 'मौसम्बी'),
+    'linseed': ('linseed', 'alsi', 'अलसी'),
+    'sponge gourd': ('sponge gourd', 'nenua', 'नेनुआ')
+})
+
+# States and districts with their alternative names
+LOCATION_MAP = MappingProxyType({
+    # States
+    'andhra pradesh': ('andhra pradesh', 'andhra', 'आंध्र प्रदेश'),
+    'bihar': ('bihar', 'बिहार'),
+    'chandigarh': ('chandigarh', 'चंडीगढ़'),
+    'chattisgarh': ('chattisgarh', 'chhattisgarh', 'छत्तीसगढ़'),
+    'gujarat': ('gujarat', 'गुजरात'),
+    'haryana': ('haryana', 'हरियाणा'),
+    'himachal pradesh': ('himachal pradesh', 'हिमाचल प्रदेश'),
+    'jammu and kashmir': ('jammu and kashmir', 'jammu', 'kashmir', 'जम्मू और कश्मीर'),
+    'karnataka': ('karnataka', 'कर्नाटक'),
+    'kerala': ('kerala', 'केरल'),
+    'uttar pradesh': ('uttar pradesh', 'up', 'उत्तर प्रदेश'),
+    'delhi': ('delhi', 'dilli', 'दिल्ली'),
+
+    # Districts (with some major cities for expansion)
+    'agra': ('agra', 'आगरा'),
+    'aligarh': ('aligarh', 'अलीगढ़'),
+    'ambedkarnagar': ('ambedkarnagar', 'अम्बेडकर नगर'),
+    'amethi': ('amethi', 'अमेठी'),
+    'amroha': ('amroha', 'अमरोहा'),
+    'auraiya': ('auraiya', 'औरैया'),
+    'ayodhya': ('ayodhya', 'अयोध्या'),
+    'azamgarh': ('azamgarh', 'आजमगढ़'),
+    'badaun': ('badaun', 'बदायूं'),
+    'baghpat': ('baghpat', 'बागपत'),
+    'bahraich': ('bahraich', 'बहराइच'),
+    'ballia': ('ballia', 'बलिया'),
+    'balrampur': ('balrampur', 'बलरामपुर'),
+    'banda': ('banda', 'बांदा'),
+    'barabanki': ('barabanki', 'बाराबंकी'),
+    'bareilly': ('bareilly', 'बरेली'),
+    'basti': ('basti', 'बस्ती'),
+    'bijnor': ('bijnor', 'बिजनौर'),
+    'bulandshahar': ('bulandshahar', 'बुलंदशहर'),
+    'chandauli': ('chandauli', 'चंदौली'),
+    'chitrakut': ('chitrakut', 'चित्रकूट'),
+    'deoria': ('deoria', 'देवरिया'),
+    'etah': ('etah', 'एटा'),
+    'etawah': ('etawah', 'इटावा'),
+    'farukhabad': ('farukhabad', 'फर्रुखाबाद'),
+    'fatehpur': ('fatehpur', 'फतेहपुर'),
+    'firozabad': ('firozabad', 'फिरोजाबाद'),
+    'ghaziabad': ('ghaziabad', 'गाजियाबाद'),
+    'ghazipur': ('ghazipur', 'गाजीपुर'),
+    'gonda': ('gonda', 'गोंडा'),
+    'gorakhpur': ('gorakhpur', 'गोरखपुर'),
+    'hardoi': ('hardoi', 'हरदोई'),
+    'hathras': ('hathras', 'हाथरस'),
+    'jalaun (orai)': ('jalaun', 'orai', 'जालौन', 'उरई'),
+    'jaunpur': ('jaunpur', 'जौनपुर'),
+    'jhansi': ('jhansi', 'झांसी'),
+    'kannuj': ('kannuj', 'kannauj', 'कन्नौज'),
+    'kanpur': ('kanpur', 'कानपुर'),
+    'kanpur dehat': ('kanpur dehat', 'कानपुर देहात'),
+    'kasganj': ('kasganj', 'कासगंज'),
+    'kaushambi': ('kaushambi', 'कौशाम्बी'),
+    'khiri (lakhimpur)': ('khiri', 'lakhimpur', 'खीरी', 'लखीमपुर'),
+    'kushinagar': ('kushinagar', 'कुशीनगर'),
+    'lucknow': ('lucknow', 'लखनऊ'),
+    'maharajganj': ('maharajganj', 'महराजगंज'),
+    'mainpuri': ('mainpuri', 'मैनपुरी'),
+    'meerut': ('meerut', 'मेरठ'),
+    'mirzapur': ('mirzapur', 'मिर्जापुर'),
+    'pillibhit': ('pillibhit', 'pilibhit', 'पीलीभीत'),
+    'pratapgarh': ('pratapgarh', 'प्रतापगढ़'),
+    'prayagraj': ('prayagraj', 'allahabad', 'प्रयागराज', 'इलाहाबाद'),
+    'raebarelli': ('raebarelli', 'raebareli', 'रायबरेली'),
+    'rampur': ('rampur', 'रामपुर'),
+    'saharanpur': ('saharanpur', 'सहारनपुर'),
+    'sambhal': ('sambhal', 'सम्भल'),
+    'sant kabir nagar': ('sant kabir nagar', 'संत कबीर नगर'),
+    'shahjahanpur': ('shahjahanpur', 'शाहजहांपुर'),
+    'shamli': ('shamli', 'शामली'),
+    'shravasti': ('shravasti', 'श्रावस्ती'),
+    'siddharth nagar': ('siddharth nagar', 'सिद्धार्थनगर'),
+    'sitapur': ('sitapur', 'सीतापुर'),
+    'unnao': ('unnao', 'उन्नाव'),
+    'chittor': ('chittor', 'chittoor', 'चित्तूर'),
+    'krishna': ('krishna', 'कृष्णा'),
+    'kurnool': ('kurnool', 'कुर्नूल'),
+    'nellore': ('nellore', 'नेल्लोर'),
+    'bhojpur': ('bhojpur', 'भोजपुर'),
+    'balodabazar': ('balodabazar', 'बालोदाबाजार'),
+    'bilaspur': ('bilaspur', 'बिलासपुर'),
+    'dhamtari': ('dhamtari', 'धमतरी'),
+    'janjgir': ('janjgir', 'जांजगीर'),
+    'kanker': ('kanker', 'कांकेर'),
+    'kondagaon': ('kondagaon', 'कोंडागांव'),
+    'mahasamund': ('mahasamund', 'महासमुंद'),
+    'raigarh': ('raigarh', 'रायगढ़'),
+    'rajnandgaon': ('rajnandgaon', 'राजनांदगांव'),
+    'ahmedabad': ('ahmedabad', 'अहमदाबाद'),
+    'amreli': ('amreli', 'अमरेली'),
+    'anand': ('anand', 'आनंद'),
+    'banaskanth': ('banaskanth', 'बनासकांठा'),
+    'bharuch': ('bharuch', 'भरूच'),
+    'bhavnagar': ('bhavnagar', 'भावनगर'),
+    'botad': ('botad', 'बोटाद'),
+    'dahod': ('dahod', 'दाहोद'),
+    'gandhinagar': ('gandhinagar', 'गांधीनगर'),
+    'gir somnath': ('gir somnath', 'गिर सोमनाथ'),
+    'jamnagar': ('jamnagar', 'जामनगर'),
+    'junagarh': ('junagarh', 'जूनागढ़'),
+    'kachchh': ('kachchh', 'kutch', 'कच्छ'),
+    'kheda': ('kheda', 'खेड़ा'),
+    'mehsana': ('mehsana', 'मेहसाणा'),
+    'morbi': ('morbi', 'मोरबी'),
+    'narmada': ('narmada', 'नर्मदा'),
+    'navsari': ('navsari', 'नवसारी'),
+    'patan': ('patan', 'पाटन'),
+    'porbandar': ('porbandar', 'पोरबंदर'),
+    'rajkot': ('rajkot', 'राजकोट'),
+    'sabarkantha': ('sabarkantha', 'साबरकांठा'),
+    'surat': ('surat', 'सूरत'),
+    'surendranagar': ('surendranagar', 'सुरेंद्रनगर'),
+    'ambala': ('ambala', 'अंबाला'),
+    'bhiwani': ('bhiwani', 'भिवानी'),
+    'faridabad': ('faridabad', 'फरीदाबाद'),
+    'fatehabad': ('fatehabad', 'फतेहाबाद'),
+    'gurgaon': ('gurgaon', 'gurugram', 'गुड़गांव'),
+    'hissar': ('hissar', 'hisar', 'हिसार'),
+    'jhajar': ('jhajar', 'झज्जर'),
+    'jind': ('jind', 'जींद'),
+    'kaithal': ('kaithal', 'कैथल'),
+    'karnal': ('karnal', 'करनाल'),
+    'kurukshetra': ('kurukshetra', 'कुरुक्षेत्र'),
+    'mahendragarh-narnaul': ('mahendragarh', 'narnaul', 'महेंद्रगढ़'),
+    'mewat': ('mewat', 'मेवात'),
+    'panchkula': ('panchkula', 'पंचकुला'),
+    'panipat': ('panipat', 'पानीपत'),
+    'rewari': ('rewari', 'रेवाड़ी'),
+    'rohtak': ('rohtak', 'रोहतक'),
+    'sirsa': ('sirsa', 'सिरसा'),
+    'sonipat': ('sonipat', 'सोनीपत'),
+    'yamuna nagar': ('yamuna nagar', 'यमुनानगर'),
+    'chamba': ('chamba', 'चंबा'),
+    'hamirpur': ('hamirpur', 'हमीरपुर'),
+    'kangra': ('kangra', 'कांगड़ा'),
+    'kullu': ('kullu', 'कुल्लू'),
+    'mandi': ('mandi', 'मंडी'),
+    'shimla': ('shimla', 'शिमला'),
+    'sirmore': ('sirmore', 'सिरमौर'),
+    'solan': ('solan', 'सोलन'),
+    'una': ('una', 'ऊना'),
+    'badgam': ('badgam', 'बडगाम'),
+    'kathua': ('kathua', 'कठुआ'),
+    'rajouri': ('rajouri', 'राजौरी'),
+    'bangalore': ('bangalore', 'bengaluru', 'बैंगलोर', 'बेंगलुरु'),
+    'bellary': ('bellary', 'बेल्लारी'),
+    'chamrajnagar': ('chamrajnagar', 'चामराजनगर'),
+    'chikmagalur': ('chikmagalur', 'चिकमगलूर'),
+    'chitradurga': ('chitradurga', 'चित्रदुर्ग'),
+    'davangere': ('davangere', 'दावणगेरे'),
+    'dharwad': ('dharwad', 'धारवाड़'),
+    'kalburgi': ('kalburgi', 'gulbarga', 'कलबुर्गी'),
+    'karwar(uttar kannad)': ('karwar', 'uttar kannad', 'कारवार'),
+    'kolar': ('kolar', 'कोलार'),
+    'koppal': ('koppal', 'कोप्पल'),
+    'mangalore(dakshin kannad)': ('mangalore', 'dakshin kannad', 'मंगलौर'),
+    'mysore': ('mysore', 'mysuru', 'मैसूर'),
+    'shimoga': ('shimoga', 'शिवमोग्गा'),
+    'tumkur': ('tumkur', 'तुमकुर'),
+    'alappuzha': ('alappuzha', 'अलाप्पुझा'),
+    'ernakulam': ('ernakulam', 'एर्नाकुलम'),
+    'idukki': ('idukki', 'इडुक्की'),
+    'kannur': ('kannur', 'कन्नूर'),
+    'kasargod': ('kasargod', 'कासरगोड'),
+    'kollam': ('kollam', 'कोल्लम'),
+    'kottayam': ('kottayam', 'कोट्टायम'),
+    'kozhikode(calicut)': ('kozhikode', 'calicut', 'कोझिकोड'),
+    'malappuram': ('malappuram', 'मलप्पुरम'),
+    'palakad': ('palakad', 'पालक्कड़'),
+    'pathanamthitta': ('pathanamthitta', 'पत्तनंतिट्टा'),
+    'thirssur': ('thirssur', 'thrissur', 'त्रिशूर'),
+    'thiruvananthapuram': ('thiruvananthapuram', 'तिरुवनंतपुरम'),
+    'wayanad': ('wayanad', 'वायनाड'),
+    'patna': ('patna', 'पटना'),
+    'pune': ('pune', 'पुणे'),
+    'mumbai': ('mumbai', 'bombay', 'मुंबई'),
+    'kolkata': ('kolkata', 'calcutta', 'कोलकाता')
+})
+
+# Mandi varieties and grades
+VARIETY_MAP = MappingProxyType({
+    'hybrid': ('hybrid', 'हाइब्रिड'),
+    'achhu': ('achhu', 'आच्छू'),
+    'bpt': ('b p t', 'bpt', 'बीपीटी'),
+    'sona': ('sona', 'सोना'),
+    'local': ('local', 'स्थानीय', 'local (whole)'),
+    'jyoti': ('jyoti', 'ज्योति'),
+    'desi': ('desi', 'desi (whole)', 'deshi'),
+    'other': ('other',),
+    'faq': ('faq', 'f.a.q.'),
+    'non-faq': ('non-faq',),
+    'i.r. 36': ('i.r. 36',),
+    'd.b.': ('d.b.',),
+    'i.r. 64': ('i.r. 64',),
+    '1001': ('1001',),
+    'mtu-1010': ('mtu-1010',),
+    'soyabeen': ('soyabeen',),
+    'capsicum': ('capsicum',),
+    'ajwan': ('ajwan',),
+    'mustard': ('mustard', 'mustard oil'),
+    'castor seed': ('castor seed',),
+    'lokwan': ('lokwan',),
+    'bhindi': ('bhindi',),
+    'cabbage': ('cabbage',),
+    'coriander': ('coriander',),
+    'green ginger': ('green ginger',),
+    '777 new ind': ('777 new ind',),
+    'cummin seed(jeera)': ('cummin seed(jeera)',),
+    'white': ('white',),
+    'amruthapani': ('amruthapani',),
+    'bitter gourd': ('bitter gourd',),
+    'cauliflower': ('cauliflower',),
+    'cucumbar': ('cucumbar',),
+    'green chilly': ('green chilly',),
+    'tomato': ('tomato',),
+    'bold': ('bold',),
+    'red': ('red',),
+    'yellow': ('yellow',),
+    'paddy fine': ('paddy fine',),
+    'bottle gourd': ('bottle gourd',),
+    'carrot': ('carrot',),
+    'mint(pudina)': ('mint(pudina)',),
+    'brinjal': ('brinjal',),
+    'kabul': ('kabul',),
+    'lemon': ('lemon',),
+    'methiseeds': ('methiseeds',),
+    'ground nut seed': ('ground nut seed',),
+    'nasik': ('nasik',),
+    'arkasheela mattigulla': ('arkasheela mattigulla',),
+    '(red nanital)': ('(red nanital)',),
+    'african sarson': ('african sarson',),
+    'gwar': ('gwar',),
+    'pumpkin': ('pumpkin',),
+    'colacasia': ('colacasia',),
+    'mousambi': ('mousambi',),
+    'green peas': ('green peas',),
+    'long melon (kakri)': ('long melon (kakri)',),
+    'dara': ('dara',),
+    'sarson(black)': ('sarson(black)',),
+    'kasmir/shimla - ii': ('kasmir/shimla - ii',),
+    'round/long': ('round/long',),
+    'round': ('round',),
+    'ghee': ('ghee',),
+    'masoor gola': ('masoor gola',),
+    'sponge gourd': ('sponge gourd',),
+    'banana - ripe': ('banana - ripe',),
+    'black gram dal': ('black gram dal',),
+    'pointed gourd (parval)': ('pointed gourd (parval)',),
+    'pomogranate': ('pomogranate',),
+    'delicious': ('delicious',),
+    'papaya': ('papaya',),
+    'average': ('average',),
+    'lohi black': ('lohi black',),
+    'iii': ('iii',),
+    'arhar dal(tur)': ('arhar dal(tur)',),
+    'masur dal': ('masur dal',),
+    'average (whole)': ('average (whole)',),
+    'white peas': ('white peas',),
+    'kala masoor new': ('kala masoor new',),
+    'banana - green': ('banana - green',),
+    'lime': ('lime',),
+    'pathari': ('pathari',),
+    'basmati 1509': ('basmati 1509',),
+    'linseed': ('linseed',),
+    'common': ('common',),
+    'peas(dry)': ('peas(dry)',),
+    'raddish': ('raddish',),
+    'jowar ( white)': ('jowar ( white)',),
+    'badshah': ('badshah',),
+    'khandsari': ('khandsari',),
+    'basumathi': ('basumathi',),
+    'eucalyptus': ('eucalyptus',)
+})
+
+# Common crop names -> mandi commodity names
+CROP_COMMODITY_NAMES = MappingProxyType({
+    'wheat': 'Wheat',
+    'rice': 'Rice',
+    'tomato': 'Tomato',
+    'potato': 'Potato',
+    'paddy': 'Paddy(Dhan)(Common)',
+    'tur': 'Arhar (Tur/Red Gram)(Whole)',
+    'gram': 'Bengal Gram(Gram)(Whole)',
+    'urd': 'Black Gram (Urd Beans)(Whole)',
+    'millet': 'Foxtail Millet(Navane)',
+    'jaggery': 'Gur(Jaggery)',
+    'wood': 'Wood',
+    'cucumber': 'Cucumbar(Kheera)',
+    'chilli': 'Green Chilli',
+    'lemon': 'Lemon',
+    'pumpkin': 'Pumpkin',
+    'maize': 'Maize',
+    'sugarcane': 'Sugarcane'
+})
+
+# Reverse mapping for commodity (or common) name to common name
+COMMODITY_CROP_NAMES = MappingProxyType({
+    **{v.lower(): k for k, v in CROP_COMMODITY_NAMES.items()},
+    **{k.lower(): k for k in CROP_COMMODITY_NAMES}
+})
+
+# Answer templates for the CSV-backed handlers, keyed by (answer, language)
+RESPONSE_TEMPLATES = MappingProxyType({
+    ('price', 'english'): ("Price of {crop} ({variety}) in {market}: "
+                           "Min ₹{min_price}, Max ₹{max_price}, "
+                           "Modal ₹{modal_price} per quintal (date: {date})"),
+    ('price', 'hindi'): ("{market} में {crop} ({variety}) की कीमत: "
+                         "न्यूनतम ₹{min_price}, अधिकतम ₹{max_price}, "
+                         "मोडल ₹{modal_price} प्रति क्विंटल (तारीख: {date})"),
+    ('weather', 'english'): ("Weather in {location}: {condition}, Temperature: {temperature}°C, "
+                             "Humidity: {humidity}%, Rainfall: {rainfall}mm. Forecast: {forecast}"),
+    ('weather', 'hindi'): ("{location} में मौसम: {condition}, तापमान: {temperature}°C, "
+                           "नमी: {humidity}%, वर्षा: {rainfall}mm. पूर्वानुमान: {forecast}"),
+    ('season_advice', 'english'): "Advice for {crop} in {season} season: {advice}",
+    ('season_advice', 'hindi'): "{season} मौसम में {crop} के लिए सलाह: {advice}",
+    ('advice', 'english'): "Advice for {crop}: {advice}",
+    ('advice', 'hindi'): "{crop} के लिए सलाह: {advice}",
+    ('variety', 'english'): ("Major variety of {crop}: {variety}, Characteristics: {characteristics}, "
+                             "Yield: {yield_val}, Duration: {duration}"),
+    ('variety', 'hindi'): ("{crop} की प्रमुख किस्म: {variety}, विशेषताएं: {characteristics}, "
+                           "उपज: {yield_val}, अवधि: {duration}"),
+    ('variety_not_found', 'english'): "Sorry, I don't have information about varieties of {crop}",
+    ('variety_not_found', 'hindi'): "क्षमा करें, मेरे पास {crop} की किस्मों की जानकारी नहीं है",
+    ('market', 'english'): ("Major agricultural market in {location}: {market_name}, "
+                            "Contact: {contact}, Business hours: {business_hours}"),
+    ('market', 'hindi'): ("{location} में प्रमुख कृषि बाजार: {market_name}, "
+                          "संपर्क: {contact}, व्यापार के घंटे: {business_hours}"),
+    ('market_not_found', 'english'): "Sorry, I don't have information about markets in {location}",
+    ('market_not_found', 'hindi'): "क्षमा करें, मेरे पास {location} में बाजारों की जानकारी नहीं है"
+})
+
+# Lookarounds that keep a keyword from matching inside a longer word
+WORD_START = r'(?<!\w)'
+WORD_END = r'(?!\w)'
+
+def compile_keywords(keywords, prefix='', suffix=''):
+    """Compile keywords into one alternation, longest first so overlapping keywords match in full"""
+    alternation = '|'.join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+    return re.compile(f'{prefix}(?:{alternation}){suffix}')
+
+def compile_entities(entity_tags):
+    """Compile every entity variation into one longest-first alternation. Crops only need to
+    start a word ("tomatoes"); other kinds must be whole words so short names like "up" or
+    "red" don't match inside other words. The word_end group tells the two apart for
+    variations that are a crop as well as a variety"""
+    alternatives = []
+    for variation in sorted(entity_tags, key=len, reverse=True):
+        whole_word = all(kind != 'crop' for kind, name in entity_tags[variation])
+        alternatives.append(re.escape(variation) + (WORD_END if whole_word else ''))
+    return re.compile(f"{WORD_START}(?:{'|'.join(alternatives)})(?P<word_end>{WORD_END})?")
+
+def build_lookup(entity_map):
+    """Flatten a name -> variations map into variation -> name (the first name listed wins)"""
+    lookup = {}
+    for name, variations in entity_map.items():
+        for variation in variations:
+            lookup.setdefault(variation, name)
+    return lookup
 
 class AgriculturalAssistantV5:
     def __init__(self):
         self.recognizer = sr.Recognizer()
-        self.tts_engine = pyttsx3.init()
+        # Ambient noise is measured on the first listen only; the recognizer's dynamic
+        # energy threshold keeps adapting from there
+        self.noise_calibrated = False
         
-        # Set slower speaking rate for better comprehension
-        self.tts_engine.setProperty('rate', 150)
+        # Speech runs on a single worker thread so the main loop never waits on it; some TTS
+        # drivers (SAPI5, NSSpeechSynthesizer) only work on the thread that created the
+        # engine, so the worker creates it
+        self.tts_engine = None
+        self.tts_executor = ThreadPoolExecutor(max_workers=1, initializer=self._init_tts)
+        # The most recently queued speech, waited on before the microphone records
+        self.speech = None
+        # Set while the assistant is speaking, so the background listener can ignore its voice
+        self.speaking = threading.Event()
+        self.speech_ended = 0.0
+        # Utterances captured by the background listener in hands-free mode
+        self.audio_queue = queue.Queue()
         
         self.conversation_context = {
             'last_crop': None,
             'last_location': None,
             'last_intent': None,
             'user_preferences': {},
-            'conversation_history': []
+            # Bounded, so the oldest intent drops off as a new one is appended
+            'recent_intents': deque(maxlen=RECENT_INTENTS)
         }
         self.supported_languages = ['english', 'hindi']
         self.current_language = 'english'
@@ -36,15 +560,53 @@ class AgriculturalAssistantV5:
         # Initialize ML components
         self.intent_classifier = None
         self.vectorizer = None
+        # Repeated utterances are classified once; cleared whenever the models are (re)loaded
+        self.classify_cache = lru_cache(maxsize=1024)(self._classify_intent)
+        # Language detection only looks at the text, so it is cached the same way
+        self.detect_language = lru_cache(maxsize=1024)(self._detect_language)
         self.load_ml_models()
         
-        # Load data from CSV files
-        self.mandi_price_data = self.load_mandi_price_data('data/mandi_prices.csv')
-        self.weather_data = self.load_csv_data('data/weather_data.csv')
-        self.advice_data = self.load_csv_data('data/crop_advice.csv')
-        self.localization_data = self.load_csv_data('data/localization.csv')
-        self.crop_varieties = self.load_csv_data('data/crop_varieties.csv')
-        self.market_info = self.load_csv_data('data/market_info.csv')
+        # Localized message templates are fixed once loaded, so each (key, language) is looked
+        # up in the table once
+        self.localized_template = lru_cache(maxsize=256)(self._localized_template)
+        # Price, weather, advice, variety and market answers depend only on their arguments and
+        # the language, so repeated questions are answered from this cache; call
+        # response_cache.cache_clear() if the data files change while running
+        self.response_cache = lru_cache(maxsize=512)(self._cached_response)
+        
+        # Compile each language's intent keywords into one pattern so a query is scanned once
+        self.intent_ranks = {}
+        self.intent_patterns = {}
+        for language, intents in INTENT_KEYWORDS.items():
+            ranks = {}
+            for rank, (intent, keywords) in enumerate(intents):
+                for keyword in keywords:
+                    ranks.setdefault(keyword, rank)
+            self.intent_ranks[language] = ranks
+            self.intent_patterns[language] = compile_keywords(ranks)
+        
+        # Flatten the entity maps into one variation -> ((kind, name), ...) table with a single
+        # pattern, so an utterance is scanned once for crops, locations and varieties together
+        # (a variation such as "tomato" can name both a crop and a mandi variety)
+        self.entity_tags = defaultdict(tuple)
+        for kind, entity_map in (('crop', CROP_MAP), ('location', LOCATION_MAP), ('variety', VARIETY_MAP)):
+            for variation, name in build_lookup(entity_map).items():
+                self.entity_tags[variation] += ((kind, name),)
+        self.entity_tags = dict(self.entity_tags)
+        self.entity_pattern = compile_entities(self.entity_tags)
+        
+        # Response handler per intent; anything else gets handle_unknown
+        self.intent_handlers = {
+            'get_price': self.handle_price,
+            'get_weather': self.handle_weather,
+            'get_advice': self.handle_advice,
+            'get_variety_info': self.handle_variety_info,
+            'get_market_info': self.handle_market_info,
+            'greeting': self.handle_greeting
+        }
+        
+        # The data tables (mandi_price_data, weather_data, ...) are read from CSV on first use,
+        # by which time the default files created below exist
         
         # Create data directory if it doesn't exist
         os.makedirs('data', exist_ok=True)
@@ -54,49 +616,65 @@ class AgriculturalAssistantV5:
         
         # Load conversation history if exists
         self.load_conversation_history()
-        
-        # Create mapping between common crop names and commodity names
-        self.crop_name_mapping = {
-            'wheat': 'Wheat',
-            'rice': 'Rice',
-            'tomato': 'Tomato',
-            'potato': 'Potato',
-            'paddy': 'Paddy(Dhan)(Common)',
-            'tur': 'Arhar (Tur/Red Gram)(Whole)',
-            'gram': 'Bengal Gram(Gram)(Whole)',
-            'urd': 'Black Gram (Urd Beans)(Whole)',
-            'millet': 'Foxtail Millet(Navane)',
-            'jaggery': 'Gur(Jaggery)',
-            'wood': 'Wood',
-            'cucumber': 'Cucumbar(Kheera)',
-            'chilli': 'Green Chilli',
-            'lemon': 'Lemon',
-            'pumpkin': 'Pumpkin',
-            'maize': 'Maize',
-            'sugarcane': 'Sugarcane'
-        }
-        
-        # Create reverse mapping for commodity to common name
-        self.reverse_crop_mapping = {v.lower(): k for k, v in self.crop_name_mapping.items()}
-        for common_name in self.crop_name_mapping.keys():
-            self.reverse_crop_mapping[common_name.lower()] = common_name
+    
+    # Data tables, each loaded from its CSV file the first time it is needed
+    @cached_property
+    def mandi_price_data(self):
+        return self.load_mandi_price_data('data/mandi_prices.csv')
+    
+    @cached_property
+    def weather_data(self):
+        return self.load_csv_data('data/weather_data.csv', categories=('location', 'condition'))
+    
+    @cached_property
+    def advice_data(self):
+        return self.load_csv_data('data/crop_advice.csv', index=['crop', 'season'],
+                                  categories=('crop', 'season', 'soil_type'))
+    
+    @cached_property
+    def localization_data(self):
+        return self.load_csv_data('data/localization.csv')
+    
+    @cached_property
+    def crop_varieties(self):
+        return self.load_csv_data('data/crop_varieties.csv')
+    
+    @cached_property
+    def market_info(self):
+        return self.load_csv_data('data/market_info.csv', categories=('location',))
     
     def load_mandi_price_data(self, filepath):
-        """Load mandi price data from CSV file with the given structure"""
-        data = []
+        """Load mandi price data from CSV file into a DataFrame indexed by the MANDI_INDEX columns"""
         try:
-            if os.path.exists(filepath):
-                df = pd.read_csv(filepath)
+            chunks = []
+            # Grade is never shown, so it is skipped while parsing; the file is memory-mapped so
+            # the parser reads it straight from the page cache
+            for chunk in pd.read_csv(filepath, usecols=lambda col: col != 'Grade', chunksize=MANDI_CHUNK_ROWS,
+                                     memory_map=True):
                 # Convert column names to standard format
-                df.columns = df.columns.str.replace('_x0020_', ' ')
-                df.columns = df.columns.str.replace('Arrival_Date', 'Arrival Date')
+                chunk.rename(columns=MANDI_COLUMNS, inplace=True)
                 
-                # Convert to list of dictionaries
-                data = df.to_dict('records')
-            return data
+                # Typed columns, so prices are numeric and dates sort chronologically; done per
+                # chunk so only one chunk of raw strings is held at a time
+                chunk = chunk.astype({col: dtype for col, dtype in MANDI_DTYPES.items() if col in chunk.columns})
+                chunk['Arrival Date'] = pd.to_datetime(chunk['Arrival Date'], format='%d-%m-%Y', errors='coerce')
+                chunks.append(chunk)
+            df = pd.concat(chunks, ignore_index=True)
+            # Chunks have their own categories, so re-derive one shared set for the whole table
+            df = df.astype({col: dtype for col, dtype in MANDI_DTYPES.items()
+                            if dtype == 'category' and col in df.columns})
+            
+            # Lowercase index so a lookup is a hashed index search instead of a scan over every row
+            df.index = pd.MultiIndex.from_arrays(
+                [df[col].astype(str).str.lower() for col in MANDI_INDEX],
+                names=[col.lower() for col in MANDI_INDEX])
+            return df.sort_index()
+        except FileNotFoundError:
+            # No file yet, so start empty
+            pass
         except Exception as e:
             print(f"Error loading mandi price data: {e}")
-            return []
+        return pd.DataFrame()
     
     def create_default_data_files(self):
         """Create default CSV files if they don't exist"""
@@ -181,22 +759,24 @@ class AgriculturalAssistantV5:
             ]
             self.save_csv_data('data/market_info.csv', market_data)
     
-    def load_csv_data(self, filepath):
-        """Load data from a CSV file into a dictionary"""
-        data = {}
+    def load_csv_data(self, filepath, index=None, categories=()):
+        """Load data from a CSV file into a DataFrame indexed by its lowercased key columns
+        (the first column unless index is given), with the categories columns as category dtype"""
         try:
-            if os.path.exists(filepath):
-                with open(filepath, mode='r', encoding='utf-8') as file:
-                    reader = csv.DictReader(file)
-                    for row in reader:
-                        if len(row) > 0:
-                            # Use the first column value as key
-                            key = list(row.values())[0].lower()
-                            data[key] = row
-            return data
+            # Everything as text with empty cells kept as '', like csv.DictReader gives
+            df = pd.read_csv(filepath, dtype=str, keep_default_na=False, encoding='utf-8', memory_map=True)
+            index = index or [df.columns[0]]
+            for col in index:
+                df[col] = df[col].str.lower()
+            # A repeated key keeps its last row, as the old dict did
+            df = df.drop_duplicates(subset=index, keep='last')
+            return df.astype(dict.fromkeys(categories, 'category')).set_index(index)
+        except FileNotFoundError:
+            # No file yet, so start empty
+            pass
         except Exception as e:
             print(f"Error loading CSV file {filepath}: {e}")
-            return {}
+        return pd.DataFrame()
     
     def save_csv_data(self, filepath, data):
         """Save data to a CSV file"""
@@ -208,40 +788,78 @@ class AgriculturalAssistantV5:
             print(f"Error saving CSV file {filepath}: {e}")
     
     def load_conversation_history(self):
-        """Load conversation history from file if exists"""
+        """Count the turns already in the history file, if it exists"""
+        # Rows currently in the file, so save_conversation_history knows when to compact it
+        self.history_rows_on_disk = 0
+        # Append handle, opened on the first new turn and kept until the history is saved
+        self.history_file = None
         try:
-            if os.path.exists('data/conversation_history.csv'):
-                with open('data/conversation_history.csv', mode='r', encoding='utf-8') as file:
-                    reader = csv.DictReader(file)
-                    self.conversation_context['conversation_history'] = list(reader)
+            with open(HISTORY_PATH, mode='r', encoding='utf-8') as file:
+                # Rows are only counted (minus the header); none are kept in memory
+                self.history_rows_on_disk = max(sum(1 for row in csv.reader(file)) - 1, 0)
+        except FileNotFoundError:
+            # No file yet, so start empty
+            pass
         except Exception as e:
             print(f"Error loading conversation history: {e}")
     
+    def append_conversation_history(self, entry):
+        """Append one turn to the history file without rewriting it"""
+        try:
+            if self.history_file is None:
+                self.history_file = open(HISTORY_PATH, mode='a', newline='', encoding='utf-8')
+                self.history_writer = csv.DictWriter(self.history_file, fieldnames=HISTORY_FIELDS,
+                                                     extrasaction='ignore')
+                if self.history_file.tell() == 0:
+                    self.history_writer.writeheader()
+            self.history_writer.writerow(entry)
+            # Flushed every turn so a crash loses nothing
+            self.history_file.flush()
+            self.history_rows_on_disk += 1
+        except Exception as e:
+            print(f"Error saving conversation history: {e}")
+    
     def save_conversation_history(self):
-        """Save conversation history to file"""
+        """Close the history file, compacting it to the last HISTORY_LIMIT turns if it has grown past them"""
+        if self.history_file is not None:
+            self.history_file.close()
+            self.history_file = None
+        
+        if self.history_rows_on_disk <= HISTORY_LIMIT:
+            return
         try:
-            with open('data/conversation_history.csv', mode='w', newline='', encoding='utf-8') as file:
-                if self.conversation_context['conversation_history']:
-                    fieldnames = self.conversation_context['conversation_history'][0].keys()
-                    writer = csv.DictWriter(file, fieldnames=fieldnames)
-                    writer.writeheader()
-                    writer.writerows(self.conversation_context['conversation_history'])
+            with open(HISTORY_PATH, mode='r', encoding='utf-8') as file:
+                history = deque(csv.DictReader(file), maxlen=HISTORY_LIMIT)
+            # Written beside the file and swapped in, so an interrupted save can't lose the history
+            temp_path = HISTORY_PATH + '.tmp'
+            with open(temp_path, mode='w', newline='', encoding='utf-8') as file:
+                writer = csv.DictWriter(file, fieldnames=HISTORY_FIELDS, extrasaction='ignore')
+                writer.writeheader()
+                writer.writerows(history)
+            os.replace(temp_path, HISTORY_PATH)
+            self.history_rows_on_disk = len(history)
         except Exception as e:
             print(f"Error saving conversation history: {e}")
     
+    def _localized_template(self, key, language):
+        """Localized template for key in language, or None if unknown (cached as localized_template)"""
+        if key in self.localization_data.index:
+            row = self.localization_data.loc[key]
+            return row.get(language) or row.get('english', '')
+        return None
+    
     def get_localized_text(self, key, **kwargs):
         """Get localized text based on the current language"""
-        if key in self.localization_data:
-            text = self.localization_data[key].get(self.current_language, 
-                                                  self.localization_data[key].get('english', ''))
-            # Format the text with any provided keyword arguments
-            if kwargs:
-                try:
-                    text = text.format(**kwargs)
-                except KeyError:
-                    pass
-            return text
-        return key  # Return the key itself if not found
+        text = self.localized_template(key, self.current_language)
+        if text is None:
+            return key  # Return the key itself if not found
+        # Format the text with any provided keyword arguments
+        if kwargs:
+            try:
+                text = text.format(**kwargs)
+            except KeyError:
+                pass
+        return text
     
     def load_ml_models(self):
         """Load pre-trained ML models for intent classification"""
@@ -249,590 +867,264 @@ class AgriculturalAssistantV5:
             # Create models directory if it doesn't exist
             os.makedirs('models', exist_ok=True)
             
-            # Check if models exist, otherwise use rule-based
-            if os.path.exists('models/vectorizer.joblib') and os.path.exists('models/intent_classifier.joblib'):
-                self.vectorizer = joblib.load('models/vectorizer.joblib')
-                self.intent_classifier = joblib.load('models/intent_classifier.joblib')
-                print("ML models loaded successfully")
+            # Check if models exist, otherwise use rule-based; the arrays inside are
+            # memory-mapped, so they are paged in on demand and shared between processes
+            if os.path.exists(MODEL_BUNDLE_PATH):
+                bundle = joblib.load(MODEL_BUNDLE_PATH, mmap_mode='r')
+                self.vectorizer = bundle['vectorizer']
+                self.intent_classifier = bundle['classifier']
+            elif os.path.exists('models/vectorizer.joblib') and os.path.exists('models/intent_classifier.joblib'):
+                self.vectorizer = joblib.load('models/vectorizer.joblib', mmap_mode='r')
+                self.intent_classifier = joblib.load('models/intent_classifier.joblib', mmap_mode='r')
             else:
                 print("ML models not found. Using rule-based classification")
                 self.intent_classifier = None
+            
+            if self.intent_classifier is not None:
+                self.idf = np.ascontiguousarray(self.vectorizer.idf_, dtype=np.float64)
+                # The classifier's weights as terms x classes, so scoring is one sparse-dense product
+                coef, intercept = self.intent_classifier.coef_, self.intent_classifier.intercept_
+                if coef.shape[0] == 1:
+                    # Two intents: sklearn keeps one weight row, for the second class, and
+                    # predict_proba is the sigmoid of its score, which is the softmax of [0, score]
+                    coef = np.vstack([np.zeros_like(coef), coef])
+                    intercept = np.concatenate([[0.0], intercept])
+                self.term_coef = np.ascontiguousarray(coef.T)
+                self.intercept = np.asarray(intercept)
+                self.intent_classes = self.intent_classifier.classes_
+                # One throwaway prediction at load, so the first real query doesn't pay for
+                # first-call setup
+                self.intent_probabilities(self.tfidf_transform(['hello']))
+                print("ML models loaded successfully")
         except Exception as e:
             print(f"Error loading ML models: {e}")
             self.intent_classifier = None
+        self.classify_cache.cache_clear()
+    
+    def tfidf_transform(self, texts):
+        """TF-IDF features for texts, weighting the raw count matrix in place"""
+        # Counting is the CountVectorizer half of the vectorizer's transform; the idf weights and
+        # norm are then applied straight to the sparse data, so no idf-diagonal product or copy
+        # of the whole matrix is made
+        features = CountVectorizer.transform(self.vectorizer, texts)
+        features.data = features.data.astype(np.float64, copy=False)
+        if self.vectorizer.sublinear_tf:
+            np.log(features.data, features.data)
+            features.data += 1.0
+        features.data *= self.idf[features.indices]
+        if self.vectorizer.norm is not None:
+            features = normalize(features, norm=self.vectorizer.norm, copy=False)
+        return features
+    
+    def intent_probabilities(self, features):
+        """Intent probabilities for TF-IDF rows, as the classifier's predict_proba gives them"""
+        # Logistic regression: softmax of the linear scores (of [0, score] for two intents),
+        # computed directly so sklearn's per-call input validation is skipped
+        scores = features @ self.term_coef + self.intercept
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
     
-    def classify_intent(self, text):
-        """Classify intent using ML model with fallback to rule-based"""
-        if self.intent_classifier is not None:
+    def classify_intent(self, text_lower):
+        """Classify intent by keyword, falling back to the ML model (cached per normalized text)"""
+        # The language is part of the key because the rule-based fallback depends on it
+        return self.classify_cache(' '.join(text_lower.split()), self.current_language)
+    
+    def _classify_intent(self, text, language):
+        """Classify normalized text for the given current language"""
+        # A trigger keyword settles the intent with one regex scan; the ML model is only
+        # consulted for phrasings that contain none
+        intent = self.classify_intent_rule_based(text)
+        if intent != "unknown" or self.intent_classifier is None:
+            return intent
+        
+        try:
+            # Transform text using the trained vectorizer
+            text_vec = self.tfidf_transform([text])
+            
+            # Predict intent from the class probabilities
+            probabilities = self.intent_probabilities(text_vec)[0]
+            best = probabilities.argmax()
+            
+            # Leave low-confidence predictions unknown, as the rules did
+            if probabilities[best] >= 0.4:
+                return self.intent_classes[best]
+        except Exception as e:
+            print(f"ML classification error: {e}")
+        
+        return intent
+    
+    def classify_intents_batch(self, texts):
+        """Classify several utterances at once, e.g. when replaying logged queries"""
+        texts = [' '.join(text.lower().split()) for text in texts]
+        intents = [self.classify_intent_rule_based(text) for text in texts]
+        # Only the utterances without a trigger keyword go to the model, as in classify_intent
+        unmatched = [row for row, intent in enumerate(intents) if intent == "unknown"]
+        if self.intent_classifier is not None and unmatched:
             try:
-                # Transform text using the trained vectorizer
-                text_vec = self.vectorizer.transform([text])
-                
-                # Predict intent
-                prediction = self.intent_classifier.predict(text_vec)
-                probability = self.intent_classifier.predict_proba(text_vec).max()
+                # One transform and one scoring pass for the whole batch
+                probabilities = self.intent_probabilities(
+                    self.tfidf_transform([texts[row] for row in unmatched]))
+                best = probabilities.argmax(axis=1)
                 
-                # Fall back to rule-based if confidence is low
-                if probability < 0.4:
-                    return self.classify_intent_rule_based(text)
-                
-                return prediction[0]
+                # Same low-confidence cut-off as classify_intent, per utterance
+                for row, probs, index in zip(unmatched, probabilities, best):
+                    if probs[index] >= 0.4:
+                        intents[row] = self.intent_classes[index]
             except Exception as e:
                 print(f"ML classification error: {e}")
         
-        # Fallback to rule-based classification
-        return self.classify_intent_rule_based(text)
+        return intents
     
-    def classify_intent_rule_based(self, text):
-        """Rule-based intent classification"""
-        text = text.lower()
-        
-        # Hindi keywords
-        hindi_price_words = ['भाव', 'मूल्य', 'दर', 'कीमत', 'लागत', 'बाजार', 'मंडी', 'bhav', 'mulya', 'keemat', 'dar']
-        hindi_weather_words = ['मौसम', 'बारिश', 'तापमान', 'वर्षा', 'गर्मी', 'सर्दी', 'आर्द्रता', 'mausam', 'barish', 'temperature', 'varsha']
-        hindi_advice_words = ['रोग', 'कीट', 'समस्या', 'सलाह', 'उपाय', 'जानकारी', 'उपचार', 'बीमारी', 'rog', 'keet', 'samasya', 'salah', 'upay']
-        hindi_greeting_words = ['नमस्ते', 'हैलो', 'हाय', 'कैसे', 'धन्यवाद', 'शुक्रिया', 'namaste', 'hello', 'hi', 'kaise', 'dhanyavad']
-        hindi_variety_words = ['किस्म', 'प्रजाति', 'वैरायटी', 'बीज', 'kism', 'prajati', 'variety', 'beej']
-        hindi_market_words = ['बाजार', 'मंडी', 'बिक्री', 'खरीद', 'bazaar', 'mandi', 'bikri', 'kharid']
-        
-        # English keywords
-        english_price_words = ['price', 'cost', 'rate', 'bhav', 'market', 'mandi']
-        english_weather_words = ['weather', 'rain', 'temperature', 'forecast', 'humidity', 'hot', 'cold']
-        english_advice_words = ['disease', 'pest', 'problem', 'advice', 'help', 'treatment', 'solution']
-        english_greeting_words = ['hello', 'hi', 'hey', 'howdy', 'thanks', 'thank']
-        english_variety_words = ['variety', 'type', 'seed', 'species']
-        english_market_words = ['market', 'mandi', 'sell', 'buy']
-        
-        # Check for intent based on language
-        if self.current_language == 'hindi':
-            if any(word in text for word in hindi_price_words):
-                return "get_price"
-            elif any(word in text for word in hindi_weather_words):
-                return "get_weather"
-            elif any(word in text for word in hindi_advice_words):
-                return "get_advice"
-            elif any(word in text for word in hindi_greeting_words):
-                return "greeting"
-            elif any(word in text for word in hindi_variety_words):
-                return "get_variety_info"
-            elif any(word in text for word in hindi_market_words):
-                return "get_market_info"
-        else:
-            if any(word in text for word in english_price_words):
-                return "get_price"
-            elif any(word in text for word in english_weather_words):
-                return "get_weather"
-            elif any(word in text for word in english_advice_words):
-                return "get_advice"
-            elif any(word in text for word in english_greeting_words):
-                return "greeting"
-            elif any(word in text for word in english_variety_words):
-                return "get_variety_info"
-            elif any(word in text for word in english_market_words):
-                return "get_market_info"
+    def classify_intent_rule_based(self, text_lower):
+        """Rule-based intent classification on lowercased text"""
+        # Single pass over the text for the current language, keeping the
+        # highest-priority intent whose keyword appears
+        language = 'hindi' if self.current_language == 'hindi' else 'english'
+        intents = INTENT_KEYWORDS[language]
+        ranks = self.intent_ranks[language]
+        best_rank = len(intents)
+        for match in self.intent_patterns[language].finditer(text_lower):
+            best_rank = min(best_rank, ranks[match.group()])
+            if best_rank == 0:
+                break
         
+        if best_rank < len(intents):
+            return intents[best_rank][0]
         return "unknown"
     
-    def detect_language(self, text):
-        """Detect language based on character set"""
+    def _detect_language(self, text_lower):
+        """Detect language of lowercased text based on character set (cached as detect_language)"""
         # Check for Devanagari script characters
-        if re.search(r'[\u0900-\u097F]', text):
+        if len(text_lower.translate(_DEVANAGARI_MAP)) != len(text_lower):
             return 'hindi'
         
         # Check for common Hindi words in Roman script
-        hindi_roman_words = ['ka', 'ki', 'ke', 'mein', 'batao', 'kya', 'hai', 'hain', 
-                            'chahiye', 'bhav', 'mausam', 'salah', 'rog', 'keet', 'samasya',
-                            'kichad', 'pani', 'baarish', 'garmi', 'sardi', 'kheti', 'kaise',
-                            'karen', 'kisan', 'fasal', 'bij', 'paudha', 'khad', 'paani']
-        
-        words = text.lower().split()
-        hindi_word_count = sum(1 for word in words if word in hindi_roman_words)
+        words = text_lower.split()
         
         # If more than 20% of words are Hindi words in Roman script, it's Hindi
-        if hindi_word_count > len(words) * 0.2:
-            return 'hindi'
+        # (stop counting as soon as that is certain)
+        threshold = len(words) * 0.2
+        hindi_word_count = 0
+        for word in words:
+            if word in HINDI_ROMAN_WORDS:
+                hindi_word_count += 1
+                if hindi_word_count > threshold:
+                    return 'hindi'
         
         return 'english'
     
-    def extract_entities(self, text):
-        """Extract crop, location, variety, and other entities from text"""
-        text = text.lower()
-        
-        crop_map = {
-            'wheat': ['wheat', 'gehun', 'गेहूं', 'गेहूँ', 'sonalika', 'lokwan', 'deshi'],
-            'rice': ['rice', 'chawal', 'chaval', 'चावल', 'dhan', 'धान', 'paddy', 'paddy(dhan)(common)', 'paddy(dhan)(basmati)'],
-            'tomato': ['tomato', 'tamatar', 'टमाटर'],
-            'potato': ['potato', 'aloo', 'aalu', 'आलू', 'आलु'],
-            'tur': ['tur', 'arhar', 'red gram', 'अरहर', 'तूर', 'arhar (tur/red gram)(whole)', 'arhar dal(tur dal)'],
-            'gram': ['gram', 'chana', 'bengal gram', 'चना', 'चना दाल', 'bengal gram(gram)(whole)', 'kabuli chana(chickpeas-white)', 'bengal gram dal (chana dal)'],
-            'urd': ['urd', 'black gram', 'urad', 'उड़द', 'काला चना', 'black gram (urd beans)(whole)', 'black gram dal (urd dal)'],
-            'millet': ['millet', 'navane', 'foxtail millet', 'बाजरा', 'मिलेट', 'bajra(pearl millet/cumbu)'],
-            'jaggery': ['jaggery', 'gur', 'गुड़', 'जैगरी', 'gur(jaggery)'],
-            'cucumber': ['cucumber', 'kheera', 'cucumbar', 'खीरा', 'ककड़ी', 'cucumbar(kheera)'],
-            'chilli': ['chilli', 'mirchi', 'green chilli', 'मिर्च', 'हरी मिर्च', 'dry chillies'],
-            'lemon': ['lemon', 'nimbu', 'नींबू', 'लेमन', 'lime'],
-            'pumpkin': ['pumpkin', 'kaddu', 'कद्दू', 'पम्पकिन'],
-            'maize': ['maize', 'makka', 'मक्का', 'corn', 'मकई'],
-            'sugarcane': ['sugarcane', 'ganna', 'गन्ना'],
-            'onion': ['onion', 'pyaaz', 'प्याज'],
-            'ginger': ['ginger', 'adrak', 'अदरक', 'ginger(green)', 'ginger(dry)'],
-            'garlic': ['garlic', 'lahsun', 'लहसुन'],
-            'banana': ['banana', 'kela', 'केला', 'banana - green'],
-            'apple': ['apple', 'seb', 'सेब'],
-            'cabbage': ['cabbage', 'patta gobhi', 'पत्ता गोभी'],
-            'cauliflower': ['cauliflower', 'phool gobhi', 'फूल गोभी'],
-            'brinjal': ['brinjal', 'baingan', 'बैंगन', 'eggplant'],
-            'bhindi': ['bhindi', 'ladies finger', 'okra', 'भिंडी', 'bhindi(ladies finger)'],
-            'capsicum': ['capsicum', 'shimla mirch', 'शिमला मिर्च', 'chilly capsicum'],
-            'carrot': ['carrot', 'gajar', 'गाजर'],
-            'soyabean': ['soyabean', 'soyabeen', 'सोयाबीन'],
-            'mustard': ['mustard', 'sarson', 'सरसों', 'mustard oil'],
-            'sesame': ['sesamum(sesame,gingelly,til)', 'til', 'तिल', 'sesame'],
-            'cumin': ['cummin seed(jeera)', 'jeera', 'जीरा'],
-            'castor seed': ['castor seed'],
-            'cotton': ['cotton', 'kapas', 'कपास'],
-            'groundnut': ['groundnut', 'moongphali', 'मूंगफली', 'ground nut seed', 'groundnut pods (raw)'],
-            'jowar': ['jowar(sorghum)', 'jowar', 'sorghum', 'ज्वार'],
-            'guar': ['guar', 'gwar', 'ग्वार'],
-            'ajwan': ['ajwan', 'ajwain', 'अजवाइन'],
-            'coriander': ['coriander(leaves)', 'coriander', 'dhania', 'धनिया', 'corriander seed'],
-            'arecanut': ['arecanut(betelnut/supari)', 'supari', 'सुपारी'],
-            'coconut': ['coconut', 'nariyal', 'नारियल', 'copra'],
-            'papaya': ['papaya', 'papita', 'पपीता', 'papaya (raw)'],
-            'peas': ['peas wet', 'matar', 'मटर', 'green peas', 'peas cod', 'white peas', 'peas(dry)'],
-            'guava': ['guava', 'amrood', 'अमरूद'],
-            'pomegranate': ['pomegranate', 'anar', 'अनार'],
-            'raddish': ['raddish', 'mooli', 'मूली'],
-            'spinach': ['spinach', 'palak', 'पालक'],
-            'colacasia': ['colacasia', 'arbi', 'अरबी'],
-            'bitter gourd': ['bitter gourd', 'karela', 'करेला'],
-            'bottle gourd': ['bottle gourd', 'lauki', 'लौकी'],
-            'ridgeguard': ['ridgeguard(tori)', 'tori', 'तोरी'],
-            'snakeguard': ['snakeguard', 'chichinda', 'चिचिंडा'],
-            'wood': ['wood', 'lakdi', 'लकड़ी'],
-            'moong': ['green gram (moong)(whole)', 'moong', 'मूंग'],
-            'methi': ['methi seeds', 'methi', 'मेथी'],
-            'soanf': ['soanf', 'saunf', 'सौंफ'],
-            'drumstick': ['drumstick', 'sahjan', 'सहजन'],
-            'pear': ['pear(marasebu)', 'nashpati', 'नाशपाती'],
-            'grapes': ['grapes', 'angoor', 'अंगूर'],
-            'orange': ['orange', 'santara', 'संतरा'],
-            'pineapple': ['pineapple', 'ananas', 'अनानास'],
-            'watermelon': ['water melon', 'tarbooj', 'तरबूज'],
-            'tapioca': ['tapioca'],
-            'rubber': ['rubber'],
-            'pepper': ['black pepper', 'pepper ungarbled', 'kali mirch', 'काली मिर्च'],
-            'nutmeg': ['nutmeg', 'jaiphal', 'जायफल'],
-            'turmeric': ['turmeric', 'haldi', 'हल्दी'],
-            'barley': ['barley (jau)', 'jau', 'जौ'],
-            'ghee': ['ghee', 'घी'],
-            'lentil': ['lentil (masur)(whole)', 'masur dal', 'masoor', 'मसूर'],
-            'parval': ['pointed gourd (parval)', 'parval', 'परवल'],
-            'sweet lime': ['mousambi(sweet lime)', 'mosambi', 'मौसम्बी'],
-            'linseed': ['linseed', 'alsi', 'अलसी'],
-            'sponge gourd': ['sponge gourd', 'nenua', 'नेनुआ']
-        }
-
-        location_map = {
-            # States
-            'andhra pradesh': ['andhra pradesh', 'andhra', 'आंध्र प्रदेश'],
-            'bihar': ['bihar', 'बिहार'],
-            'chandigarh': ['chandigarh', 'चंडीगढ़'],
-            'chattisgarh': ['chattisgarh', 'chhattisgarh', 'छत्तीसगढ़'],
-            'gujarat': ['gujarat', 'गुजरात'],
-            'haryana': ['haryana', 'हरियाणा'],
-            'himachal pradesh': ['himachal pradesh', 'हिमाचल प्रदेश'],
-            'jammu and kashmir': ['jammu and kashmir', 'jammu', 'kashmir', 'जम्मू और कश्मीर'],
-            'karnataka': ['karnataka', 'कर्नाटक'],
-            'kerala': ['kerala', 'केरल'],
-            'uttar pradesh': ['uttar pradesh', 'up', 'उत्तर प्रदेश'],
-            'delhi': ['delhi', 'dilli', 'दिल्ली'],
-
-            # Districts (with some major cities for expansion)
-            'agra': ['agra', 'आगरा'],
-            'aligarh': ['aligarh', 'अलीगढ़'],
-            'ambedkarnagar': ['ambedkarnagar', 'अम्बेडकर नगर'],
-            'amethi': ['amethi', 'अमेठी'],
-            'amroha': ['amroha', 'अमरोहा'],
-            'auraiya': ['auraiya', 'औरैया'],
-            'ayodhya': ['ayodhya', 'अयोध्या'],
-            'azamgarh': ['azamgarh', 'आजमगढ़'],
-            'badaun': ['badaun', 'बदायूं'],
-            'baghpat': ['baghpat', 'बागपत'],
-            'bahraich': ['bahraich', 'बहराइच'],
-            'ballia': ['ballia', 'बलिया'],
-            'balrampur': ['balrampur', 'बलरामपुर'],
-            'banda': ['banda', 'बांदा'],
-            'barabanki': ['barabanki', 'बाराबंकी'],
-            'bareilly': ['bareilly', 'बरेली'],
-            'basti': ['basti', 'बस्ती'],
-            'bijnor': ['bijnor', 'बिजनौर'],
-            'bulandshahar': ['bulandshahar', 'बुलंदशहर'],
-            'chandauli': ['chandauli', 'चंदौली'],
-            'chitrakut': ['chitrakut', 'चित्रकूट'],
-            'deoria': ['deoria', 'देवरिया'],
-            'etah': ['etah', 'एटा'],
-            'etawah': ['etawah', 'इटावा'],
-            'farukhabad': ['farukhabad', 'फर्रुखाबाद'],
-            'fatehpur': ['fatehpur', 'फतेहपुर'],
-            'firozabad': ['firozabad', 'फिरोजाबाद'],
-            'ghaziabad': ['ghaziabad', 'गाजियाबाद'],
-            'ghazipur': ['ghazipur', 'गाजीपुर'],
-            'gonda': ['gonda', 'गोंडा'],
-            'gorakhpur': ['gorakhpur', 'गोरखपुर'],
-            'hardoi': ['hardoi', 'हरदोई'],
-            'hathras': ['hathras', 'हाथरस'],
-            'jalaun (orai)': ['jalaun', 'orai', 'जालौन', 'उरई'],
-            'jaunpur': ['jaunpur', 'जौनपुर'],
-            'jhansi': ['jhansi', 'झांसी'],
-            'kannuj': ['kannuj', 'kannauj', 'कन्नौज'],
-            'kanpur': ['kanpur', 'कानपुर'],
-            'kanpur dehat': ['kanpur dehat', 'कानपुर देहात'],
-            'kasganj': ['kasganj', 'कासगंज'],
-            'kaushambi': ['kaushambi', 'कौशाम्बी'],
-            'khiri (lakhimpur)': ['khiri', 'lakhimpur', 'खीरी', 'लखीमपुर'],
-            'kushinagar': ['kushinagar', 'कुशीनगर'],
-            'lucknow': ['lucknow', 'लखनऊ'],
-            'maharajganj': ['maharajganj', 'महराजगंज'],
-            'mainpuri': ['mainpuri', 'मैनपुरी'],
-            'meerut': ['meerut', 'मेरठ'],
-            'mirzapur': ['mirzapur', 'मिर्जापुर'],
-            'pillibhit': ['pillibhit', 'pilibhit', 'पीलीभीत'],
-            'pratapgarh': ['pratapgarh', 'प्रतापगढ़'],
-            'prayagraj': ['prayagraj', 'allahabad', 'प्रयागराज', 'इलाहाबाद'],
-            'raebarelli': ['raebarelli', 'raebareli', 'रायबरेली'],
-            'rampur': ['rampur', 'रामपुर'],
-            'saharanpur': ['saharanpur', 'सहारनपुर'],
-            'sambhal': ['sambhal', 'सम्भल'],
-            'sant kabir nagar': ['sant kabir nagar', 'संत कबीर नगर'],
-            'shahjahanpur': ['shahjahanpur', 'शाहजहांपुर'],
-            'shamli': ['shamli', 'शामली'],
-            'shravasti': ['shravasti', 'श्रावस्ती'],
-            'siddharth nagar': ['siddharth nagar', 'सिद्धार्थनगर'],
-            'sitapur': ['sitapur', 'सीतापुर'],
-            'unnao': ['unnao', 'उन्नाव'],
-            'chittor': ['chittor', 'chittoor', 'चित्तूर'],
-            'krishna': ['krishna', 'कृष्णा'],
-            'kurnool': ['kurnool', 'कुर्नूल'],
-            'nellore': ['nellore', 'नेल्लोर'],
-            'bhojpur': ['bhojpur', 'भोजपुर'],
-            'balodabazar': ['balodabazar', 'बालोदाबाजार'],
-            'bilaspur': ['bilaspur', 'बिलासपुर'],
-            'dhamtari': ['dhamtari', 'धमतरी'],
-            'janjgir': ['janjgir', 'जांजगीर'],
-            'kanker': ['kanker', 'कांकेर'],
-            'kondagaon': ['kondagaon', 'कोंडागांव'],
-            'mahasamund': ['mahasamund', 'महासमुंद'],
-            'raigarh': ['raigarh', 'रायगढ़'],
-            'rajnandgaon': ['rajnandgaon', 'राजनांदगांव'],
-            'ahmedabad': ['ahmedabad', 'अहमदाबाद'],
-            'amreli': ['amreli', 'अमरेली'],
-            'anand': ['anand', 'आनंद'],
-            'banaskanth': ['banaskanth', 'बनासकांठा'],
-            'bharuch': ['bharuch', 'भरूच'],
-            'bhavnagar': ['bhavnagar', 'भावनगर'],
-            'botad': ['botad', 'बोटाद'],
-            'dahod': ['dahod', 'दाहोद'],
-            'gandhinagar': ['gandhinagar', 'गांधीनगर'],
-            'gir somnath': ['gir somnath', 'गिर सोमनाथ'],
-            'jamnagar': ['jamnagar', 'जामनगर'],
-            'junagarh': ['junagarh', 'जूनागढ़'],
-            'kachchh': ['kachchh', 'kutch', 'कच्छ'],
-            'kheda': ['kheda', 'खेड़ा'],
-            'mehsana': ['mehsana', 'मेहसाणा'],
-            'morbi': ['morbi', 'मोरबी'],
-            'narmada': ['narmada', 'नर्मदा'],
-            'navsari': ['navsari', 'नवसारी'],
-            'patan': ['patan', 'पाटन'],
-            'porbandar': ['porbandar', 'पोरबंदर'],
-            'rajkot': ['rajkot', 'राजकोट'],
-            'sabarkantha': ['sabarkantha', 'साबरकांठा'],
-            'surat': ['surat', 'सूरत'],
-            'surendranagar': ['surendranagar', 'सुरेंद्रनगर'],
-            'ambala': ['ambala', 'अंबाला'],
-            'bhiwani': ['bhiwani', 'भिवानी'],
-            'faridabad': ['faridabad', 'फरीदाबाद'],
-            'fatehabad': ['fatehabad', 'फतेहाबाद'],
-            'gurgaon': ['gurgaon', 'gurugram', 'गुड़गांव'],
-            'hissar': ['hissar', 'hisar', 'हिसार'],
-            'jhajar': ['jhajar', 'झज्जर'],
-            'jind': ['jind', 'जींद'],
-            'kaithal': ['kaithal', 'कैथल'],
-            'karnal': ['karnal', 'करनाल'],
-            'kurukshetra': ['kurukshetra', 'कुरुक्षेत्र'],
-            'mahendragarh-narnaul': ['mahendragarh', 'narnaul', 'महेंद्रगढ़'],
-            'mewat': ['mewat', 'मेवात'],
-            'panchkula': ['panchkula', 'पंचकुला'],
-            'panipat': ['panipat', 'पानीपत'],
-            'rewari': ['rewari', 'रेवाड़ी'],
-            'rohtak': ['rohtak', 'रोहतक'],
-            'sirsa': ['sirsa', 'सिरसा'],
-            'sonipat': ['sonipat', 'सोनीपत'],
-            'yamuna nagar': ['yamuna nagar', 'यमुनानगर'],
-            'chamba': ['chamba', 'चंबा'],
-            'hamirpur': ['hamirpur', 'हमीरपुर'],
-            'kangra': ['kangra', 'कांगड़ा'],
-            'kullu': ['kullu', 'कुल्लू'],
-            'mandi': ['mandi', 'मंडी'],
-            'shimla': ['shimla', 'शिमला'],
-            'sirmore': ['sirmore', 'सिरमौर'],
-            'solan': ['solan', 'सोलन'],
-            'una': ['una', 'ऊना'],
-            'badgam': ['badgam', 'बडगाम'],
-            'kathua': ['kathua', 'कठुआ'],
-            'rajouri': ['rajouri', 'राजौरी'],
-            'bangalore': ['bangalore', 'bengaluru', 'बैंगलोर', 'बेंगलुरु'],
-            'bellary': ['bellary', 'बेल्लारी'],
-            'chamrajnagar': ['chamrajnagar', 'चामराजनगर'],
-            'chikmagalur': ['chikmagalur', 'चिकमगलूर'],
-            'chitradurga': ['chitradurga', 'चित्रदुर्ग'],
-            'davangere': ['davangere', 'दावणगेरे'],
-            'dharwad': ['dharwad', 'धारवाड़'],
-            'kalburgi': ['kalburgi', 'gulbarga', 'कलबुर्गी'],
-            'karwar(uttar kannad)': ['karwar', 'uttar kannad', 'कारवार'],
-            'kolar': ['kolar', 'कोलार'],
-            'koppal': ['koppal', 'कोप्पल'],
-            'mangalore(dakshin kannad)': ['mangalore', 'dakshin kannad', 'मंगलौर'],
-            'mysore': ['mysore', 'mysuru', 'मैसूर'],
-            'shimoga': ['shimoga', 'शिवमोग्गा'],
-            'tumkur': ['tumkur', 'तुमकुर'],
-            'alappuzha': ['alappuzha', 'अलाप्पुझा'],
-            'ernakulam': ['ernakulam', 'एर्नाकुलम'],
-            'idukki': ['idukki', 'इडुक्की'],
-            'kannur': ['kannur', 'कन्नूर'],
-            'kasargod': ['kasargod', 'कासरगोड'],
-            'kollam': ['kollam', 'कोल्लम'],
-            'kottayam': ['kottayam', 'कोट्टायम'],
-            'kozhikode(calicut)': ['kozhikode', 'calicut', 'कोझिकोड'],
-            'malappuram': ['malappuram', 'मलप्पुरम'],
-            'palakad': ['palakad', 'पालक्कड़'],
-            'pathanamthitta': ['pathanamthitta', 'पत्तनंतिट्टा'],
-            'thirssur': ['thirssur', 'thrissur', 'त्रिशूर'],
-            'thiruvananthapuram': ['thiruvananthapuram', 'तिरुवनंतपुरम'],
-            'wayanad': ['wayanad', 'वायनाड'],
-            'patna': ['patna', 'पटना'],
-            'pune': ['pune', 'पुणे'],
-            'mumbai': ['mumbai', 'bombay', 'मुंबई'],
-            'kolkata': ['kolkata', 'calcutta', 'कोलकाता']
-        }
-
-        variety_map = {
-            'hybrid': ['hybrid', 'हाइब्रिड'],
-            'achhu': ['achhu', 'आच्छू'],
-            'bpt': ['b p t', 'bpt', 'बीपीटी'],
-            'sona': ['sona', 'सोना'],
-            'local': ['local', 'स्थानीय', 'local (whole)'],
-            'jyoti': ['jyoti', 'ज्योति'],
-            'desi': ['desi', 'desi (whole)', 'deshi'],
-            'other': ['other'],
-            'faq': ['faq', 'f.a.q.'],
-            'non-faq': ['non-faq'],
-            'i.r. 36': ['i.r. 36'],
-            'd.b.': ['d.b.'],
-            'i.r. 64': ['i.r. 64'],
-            '1001': ['1001'],
-            'mtu-1010': ['mtu-1010'],
-            'soyabeen': ['soyabeen'],
-            'capsicum': ['capsicum'],
-            'ajwan': ['ajwan'],
-            'mustard': ['mustard', 'mustard oil'],
-            'castor seed': ['castor seed'],
-            'lokwan': ['lokwan'],
-            'bhindi': ['bhindi'],
-            'cabbage': ['cabbage'],
-            'coriander': ['coriander'],
-            'green ginger': ['green ginger'],
-            '777 new ind': ['777 new ind'],
-            'cummin seed(jeera)': ['cummin seed(jeera)'],
-            'white': ['white'],
-            'amruthapani': ['amruthapani'],
-            'bitter gourd': ['bitter gourd'],
-            'cauliflower': ['cauliflower'],
-            'cucumbar': ['cucumbar'],
-            'green chilly': ['green chilly'],
-            'tomato': ['tomato'],
-            'bold': ['bold'],
-            'red': ['red'],
-            'yellow': ['yellow'],
-            'paddy fine': ['paddy fine'],
-            'bottle gourd': ['bottle gourd'],
-            'carrot': ['carrot'],
-            'mint(pudina)': ['mint(pudina)'],
-            'brinjal': ['brinjal'],
-            'kabul': ['kabul'],
-            'lemon': ['lemon'],
-            'methiseeds': ['methiseeds'],
-            'ground nut seed': ['ground nut seed'],
-            'nasik': ['nasik'],
-            'arkasheela mattigulla': ['arkasheela mattigulla'],
-            '(red nanital)': ['(red nanital)'],
-            'african sarson': ['african sarson'],
-            'gwar': ['gwar'],
-            'pumpkin': ['pumpkin'],
-            'colacasia': ['colacasia'],
-            'mousambi': ['mousambi'],
-            'green peas': ['green peas'],
-            'long melon (kakri)': ['long melon (kakri)'],
-            'dara': ['dara'],
-            'sarson(black)': ['sarson(black)'],
-            'kasmir/shimla - ii': ['kasmir/shimla - ii'],
-            'round/long': ['round/long'],
-            'round': ['round'],
-            'ghee': ['ghee'],
-            'masoor gola': ['masoor gola'],
-            'sponge gourd': ['sponge gourd'],
-            'banana - ripe': ['banana - ripe'],
-            'black gram dal': ['black gram dal'],
-            'pointed gourd (parval)': ['pointed gourd (parval)'],
-            'pomogranate': ['pomogranate'],
-            'delicious': ['delicious'],
-            'papaya': ['papaya'],
-            'average': ['average'],
-            'lohi black': ['lohi black'],
-            'iii': ['iii'],
-            'arhar dal(tur)': ['arhar dal(tur)'],
-            'masur dal': ['masur dal'],
-            'average (whole)': ['average (whole)'],
-            'white peas': ['white peas'],
-            'kala masoor new': ['kala masoor new'],
-            'banana - green': ['banana - green'],
-            'lime': ['lime'],
-            'pathari': ['pathari'],
-            'basmati 1509': ['basmati 1509'],
-            'linseed': ['linseed'],
-            'common': ['common'],
-            'peas(dry)': ['peas(dry)'],
-            'raddish': ['raddish'],
-            'jowar ( white)': ['jowar ( white)'],
-            'badshah': ['badshah'],
-            'khandsari': ['khandsari'],
-            'basumathi': ['basumathi'],
-            'eucalyptus': ['eucalyptus']
-        }
-        
-        found_crop = None
-        found_location = None
-        found_variety = None
-        
-        # Check for crop mentions with all variations
-        for crop, variations in crop_map.items():
-            for variation in variations:
-                if variation in text:
-                    found_crop = crop
-                    break
-            if found_crop:
+    def extract_entities(self, text_lower):
+        """Extract crop, location, variety, and other entities from lowercased text"""
+        # One scan for all entity kinds; the first mention of each kind in the text wins, except
+        # that a word already taken as the crop ("tomato" is also a mandi variety) is only the
+        # variety if no other variety is mentioned, so "tomato hybrid" is the Hybrid variety
+        found = {}
+        crop_variety = None
+        for match in self.entity_pattern.finditer(text_lower):
+            whole_word = match.group('word_end') is not None
+            is_crop = False
+            for kind, name in self.entity_tags[match.group()]:
+                if kind == 'crop':
+                    is_crop = 'crop' not in found
+                    found.setdefault(kind, name)
+                elif kind == 'variety' and is_crop:
+                    if whole_word and crop_variety is None:
+                        crop_variety = name
+                elif whole_word:
+                    found.setdefault(kind, name)
+            if len(found) == 3:
                 break
-                
-        # Check for location mentions with all variations
-        for location, variations in location_map.items():
-            for variation in variations:
-                if variation in text:
-                    found_location = location
-                    break
-            if found_location:
-                break
-                
-        # Check for variety mentions
-        for variety, variations in variety_map.items():
-            for variation in variations:
-                if variation in text:
-                    found_variety = variety
-                    break
-            if found_variety:
-                break
-                
-        # If no location found, use context
-        if not found_location and self.conversation_context.get('last_location'):
-            found_location = self.conversation_context['last_location']
-            
-        # If no crop found, use context
-        if not found_crop and self.conversation_context.get('last_crop'):
-            found_crop = self.conversation_context['last_crop']
+        
+        # If no crop or location found, use context
+        context = self.conversation_context
+        found_crop = found.get('crop') or context['last_crop']
+        found_location = found.get('location') or context['last_location']
             
-        return found_crop, found_location, found_variety
+        return found_crop, found_location, found.get('variety') or crop_variety
     
     def update_conversation_context(self, intent, crop, location, user_text, response):
         """Update conversation context based on current interaction"""
+        context = self.conversation_context
         if crop:
-            self.conversation_context['last_crop'] = crop
+            context['last_crop'] = crop
             
         if location:
-            self.conversation_context['last_location'] = location
+            context['last_location'] = location
             
-        self.conversation_context['last_intent'] = intent
+        context['last_intent'] = intent
+        context['recent_intents'].append(intent)
         
-        # Add to conversation history
-        self.conversation_context['conversation_history'].append({
+        # Add to conversation history, saved every turn as it happens (the file is compacted on exit)
+        entry = {
             'timestamp': datetime.now().isoformat(),
             'user_text': user_text,
             'intent': intent,
             'response': response,
             'language': self.current_language
-        })
-        
-        # Keep only last 100 conversations
-        if len(self.conversation_context['conversation_history']) > 100:
-            self.conversation_context['conversation_history'] = self.conversation_context['conversation_history'][-100:]
-        
-        # Save conversation history periodically
-        if len(self.conversation_context['conversation_history']) % 10 == 0:
-            self.save_conversation_history()
+        }
+        self.append_conversation_history(entry)
+    
+    def response_template(self, answer):
+        """Answer template in the current language (anything but Hindi answers in English)"""
+        language = 'hindi' if self.current_language == 'hindi' else 'english'
+        return RESPONSE_TEMPLATES[(answer, language)]
     
     def get_crop_price_from_mandi(self, crop, location=None, variety=None):
         """Get crop price from mandi data based on location and variety"""
         # Map common crop name to commodity name
-        commodity_name = self.crop_name_mapping.get(crop.lower(), crop)
+        commodity_name = CROP_COMMODITY_NAMES.get(crop.lower(), crop)
         
-        # Filter data based on commodity
-        matching_records = [record for record in self.mandi_price_data 
-                           if record.get('Commodity', '').lower() == commodity_name.lower()]
+        # Select the commodity's rows through the index
+        if self.mandi_price_data.empty:
+            return None
+        try:
+            matching_records = self.mandi_price_data.xs(commodity_name.lower(), level='commodity')
+        except KeyError:
+            return None
         
         # Further filter by location if provided
         if location:
             location = location.lower()
-            matching_records = [record for record in matching_records 
-                               if (record.get('District', '').lower() == location or 
-                                   record.get('Market', '').lower() == location or
-                                   record.get('State', '').lower() == location)]
+            matching_records = matching_records[
+                (matching_records.index.get_level_values('district') == location) |
+                (matching_records.index.get_level_values('market') == location) |
+                (matching_records.index.get_level_values('state') == location)]
         
         # Further filter by variety if provided
         if variety:
             variety = variety.lower()
-            matching_records = [record for record in matching_records 
-                               if record.get('Variety', '').lower() == variety]
+            matching_records = matching_records[matching_records.index.get_level_values('variety') == variety]
         
-        if not matching_records:
+        if matching_records.empty:
             return None
         
-        # For multiple matches, return the most recent or most relevant
-        # Sort by date (most recent first)
-        try:
-            matching_records.sort(key=lambda x: datetime.strptime(x.get('Arrival Date', ''), '%d-%m-%Y'), reverse=True)
-        except:
-            pass
-        
-        return matching_records[0]
+        # For multiple matches, return the most recent; dates were parsed at load, so this is
+        # a single selection pass over the matches rather than a sort (rows without a valid
+        # date only come back when no match has one)
+        return matching_records.nlargest(1, 'Arrival Date').iloc[0]
     
     def get_crop_price(self, crop, location, variety=None):
         """Get crop price from mandi data"""
         price_record = self.get_crop_price_from_mandi(crop, location, variety)
         
-        if price_record:
+        if price_record is not None:
             market = price_record.get('Market', 'Unknown market')
             variety = price_record.get('Variety', 'Unknown variety')
             min_price = price_record.get('Min Price', 'N/A')
             max_price = price_record.get('Max Price', 'N/A')
             modal_price = price_record.get('Modal Price', 'N/A')
-            date = price_record.get('Arrival Date', 'Unknown date')
+            date = price_record.get('Arrival Date')
+            date = date.strftime('%d-%m-%Y') if pd.notna(date) else 'Unknown date'
+            # Prices are stored as float32; show them as whole rupees like the source data
+            min_price, max_price, modal_price = (
+                f"{price:.0f}" if isinstance(price, (int, float, np.number)) else price
+                for price in (min_price, max_price, modal_price))
             
-            if self.current_language == 'hindi':
-                return (f"{market} में {crop} ({variety}) की कीमत: "
-                       f"न्यूनतम ₹{min_price}, अधिकतम ₹{max_price}, "
-                       f"मोडल ₹{modal_price} प्रति क्विंटल (तारीख: {date})")
-            else:
-                return (f"Price of {crop} ({variety}) in {market}: "
-                       f"Min ₹{min_price}, Max ₹{max_price}, "
-                       f"Modal ₹{modal_price} per quintal (date: {date})")
+            return self.response_template('price').format(
+                crop=crop, variety=variety, market=market, min_price=min_price,
+                max_price=max_price, modal_price=modal_price, date=date)
         
         # If not found, return error message
         return self.get_localized_text('price_not_found', crop=crop, location=location)
@@ -842,20 +1134,17 @@ class AgriculturalAssistantV5:
         location_key = location.lower()
         
         # Look for the weather in our CSV data
-        if location_key in self.weather_data:
-            data = self.weather_data[location_key]
+        if location_key in self.weather_data.index:
+            data = self.weather_data.loc[location_key]
             condition = data.get('condition', 'N/A')
             temperature = data.get('temperature', 'N/A')
             humidity = data.get('humidity', 'N/A')
             rainfall = data.get('rainfall', 'N/A')
             forecast = data.get('forecast', 'N/A')
             
-            if self.current_language == 'hindi':
-                return (f"{location} में मौसम: {condition}, तापमान: {temperature}°C, "
-                       f"नमी: {humidity}%, वर्षा: {rainfall}mm. पूर्वानुमान: {forecast}")
-            else:
-                return (f"Weather in {location}: {condition}, Temperature: {temperature}°C, "
-                       f"Humidity: {humidity}%, Rainfall: {rainfall}mm. Forecast: {forecast}")
+            return self.response_template('weather').format(
+                location=location, condition=condition, temperature=temperature,
+                humidity=humidity, rainfall=rainfall, forecast=forecast)
         
         # If not found, return error message
         return self.get_localized_text('weather_not_found', location=location)
@@ -865,26 +1154,23 @@ class AgriculturalAssistantV5:
         crop_key = crop.lower()
         
         # Look for the advice in our CSV data
-        if crop_key in self.advice_data:
-            data = self.advice_data[crop_key]
+        if crop_key in self.advice_data.index:
+            # All of this crop's rows, indexed by season
+            crop_advice = self.advice_data.xs(crop_key, level='crop')
             # If season is specified, try to get season-specific advice
-            if season and data.get('season', '').lower() == season.lower():
+            if season and season.lower() in crop_advice.index:
+                data = crop_advice.loc[season.lower()]
                 advice_key = f'advice_{self.current_language}'
                 advice = data.get(advice_key, data.get('advice_english', 'No advice available'))
                 
-                if self.current_language == 'hindi':
-                    return f"{season} मौसम में {crop} के लिए सलाह: {advice}"
-                else:
-                    return f"Advice for {crop} in {season} season: {advice}"
+                return self.response_template('season_advice').format(crop=crop, season=season, advice=advice)
             
             # If no season specified or no season-specific advice, return general advice
+            data = crop_advice.iloc[-1]
             advice_key = f'advice_{self.current_language}'
             advice = data.get(advice_key, data.get('advice_english', 'No advice available'))
             
-            if self.current_language == 'hindi':
-                return f"{crop} के लिए सलाह: {advice}"
-            else:
-                return f"Advice for {crop}: {advice}"
+            return self.response_template('advice').format(crop=crop, advice=advice)
         
         # If not found, return error message
         return self.get_localized_text('advice_not_found', crop=crop)
@@ -894,56 +1180,50 @@ class AgriculturalAssistantV5:
         crop_key = crop.lower()
         
         # Look for the crop in our CSV data
-        if crop_key in self.crop_varieties:
-            data = self.crop_varieties[crop_key]
+        if crop_key in self.crop_varieties.index:
+            data = self.crop_varieties.loc[crop_key]
             variety = data.get('variety', 'N/A')
             characteristics = data.get('characteristics', 'N/A')
             yield_val = data.get('yield', 'N/A')
             duration = data.get('duration', 'N/A')
             
-            if self.current_language == 'hindi':
-                return (f"{crop} की प्रमुख किस्म: {variety}, विशेषताएं: {characteristics}, "
-                       f"उपज: {yield_val}, अवधि: {duration}")
-            else:
-                return (f"Major variety of {crop}: {variety}, Characteristics: {characteristics}, "
-                       f"Yield: {yield_val}, Duration: {duration}")
+            return self.response_template('variety').format(
+                crop=crop, variety=variety, characteristics=characteristics,
+                yield_val=yield_val, duration=duration)
         
         # If not found, return error message
-        if self.current_language == 'hindi':
-            return f"क्षमा करें, मेरे पास {crop} की किस्मों की जानकारी नहीं है"
-        else:
-            return f"Sorry, I don't have information about varieties of {crop}"
+        return self.response_template('variety_not_found').format(crop=crop)
     
     def get_market_info(self, location):
         """Get market information from CSV data"""
         location_key = location.lower()
         
         # Look for the market in our CSV data
-        if location_key in self.market_info:
-            data = self.market_info[location_key]
+        if location_key in self.market_info.index:
+            data = self.market_info.loc[location_key]
             market_name = data.get('market_name', 'N/A')
             contact = data.get('contact', 'N/A')
             business_hours = data.get('business_hours', 'N/A')
             
-            if self.current_language == 'hindi':
-                return (f"{location} में प्रमुख कृषि बाजार: {market_name}, "
-                       f"संपर्क: {contact}, व्यापार के घंटे: {business_hours}")
-            else:
-                return (f"Major agricultural market in {location}: {market_name}, "
-                       f"Contact: {contact}, Business hours: {business_hours}")
+            return self.response_template('market').format(
+                location=location, market_name=market_name, contact=contact,
+                business_hours=business_hours)
         
         # If not found, return error message
-        if self.current_language == 'hindi':
-            return f"क्षमा करें, मेरे पास {location} में बाजारों की जानकारी नहीं है"
-        else:
-            return f"Sorry, I don't have information about markets in {location}"
+        return self.response_template('market_not_found').format(location=location)
     
     def listen_to_speech(self):
-        """Capture and convert speech to text"""
+        """Capture and convert speech to text, returning (status, text); status is 'ok' or
+        the localization key of the failure message"""
+        # Don't record the assistant's own answer
+        self.wait_for_speech()
         try:
             with sr.Microphone() as source:
-                # Adjust for ambient noise
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                # Adjust for ambient noise (once; it costs half a second of listening)
+                if not self.noise_calibrated:
+                    self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                    self.recognizer.dynamic_energy_threshold = True
+                    self.noise_calibrated = True
                 
                 # Speak listening prompt
                 listening_text = self.get_localized_text('listening')
@@ -957,84 +1237,132 @@ class AgriculturalAssistantV5:
             print(f"You said: {text}")
             
             # Detect language
-            self.current_language = self.detect_language(text)
+            self.current_language = self.detect_language(text.lower())
             print(f"Detected language: {self.current_language}")
             
-            return text
+            return 'ok', text
         
         except sr.UnknownValueError:
-            return self.get_localized_text('not_understood')
+            return 'not_understood', None
         except sr.RequestError:
-            return self.get_localized_text('service_unavailable')
+            return 'service_unavailable', None
         except sr.WaitTimeoutError:
-            return self.get_localized_text('no_speech')
+            return 'no_speech', None
+    
+    def on_audio(self, recognizer, audio):
+        """Background listener callback: queue each captured utterance for recognition"""
+        # The listener keeps recording while an answer plays; without this the assistant
+        # would hear its own answer and reply to it
+        if not self.heard_own_speech(audio):
+            self.audio_queue.put(audio)
+    
+    def heard_own_speech(self, audio):
+        """Whether a captured utterance overlaps the assistant's own speech"""
+        # The listener hands an utterance over as soon as it ends, so it began this long ago
+        duration = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+        return self.speaking.is_set() or time.monotonic() - duration < self.speech_ended
+    
+    def _init_tts(self):
+        """Create the TTS engine on the worker thread that uses it"""
+        self.tts_engine = pyttsx3.init()
+        
+        # Set slower speaking rate for better comprehension
+        self.tts_engine.setProperty('rate', 150)
+    
+    def _speak(self, text):
+        """Synthesize text on the TTS worker thread"""
+        self.speaking.set()
+        try:
+            self.tts_engine.say(text)
+            self.tts_engine.runAndWait()
+        finally:
+            self.speech_ended = time.monotonic()
+            self.speaking.clear()
     
     def speak_response(self, response):
-        """Convert text response to speech"""
+        """Convert text response to speech without blocking the caller"""
         print(f"Assistant: {response}")
-        self.tts_engine.say(response)
-        self.tts_engine.runAndWait()
+        self.speech = self.tts_executor.submit(self._speak, response)
+    
+    def wait_for_speech(self):
+        """Block until everything queued for speech has been spoken"""
+        # Speech is spoken in order on one thread, so the latest utterance finishes last
+        if self.speech is not None:
+            wait([self.speech])
+    
+    def _cached_response(self, handler, language, *args):
+        """Response of handler(*args) in the given current language (cached as response_cache)"""
+        return handler(*args)
     
     def process_query(self, text):
         """Process user query and generate response"""
-        if text.lower() in ['exit', 'quit', 'stop', 'बंद', 'रुको']:
+        # Lowercase once and share it between the helpers below; decomposed Devanagari (as some
+        # keyboards and recognizers produce) is composed to NFC like the keyword and entity tables
+        text_lower = text.lower()
+        if not unicodedata.is_normalized('NFC', text_lower):
+            text_lower = unicodedata.normalize('NFC', text_lower)
+        if text_lower.strip() in EXIT_WORDS:
             return "exit"
             
         # Classify intent
-        intent = self.classify_intent(text)
+        intent = self.classify_intent(text_lower)
         print(f"Intent: {intent}")
         
         # Extract entities
-        crop, location, variety = self.extract_entities(text)
+        crop, location, variety = self.extract_entities(text_lower)
         
         # Generate response based on intent
-        if intent == "get_price":
-            if crop and location:
-                response = self.get_crop_price(crop, location, variety)
-            else:
-                if not crop:
-                    response = self.get_localized_text('missing_crop')
-                else:
-                    response = self.get_localized_text('missing_location')
-                    
-        elif intent == "get_weather":
-            if location:
-                response = self.get_weather_info(location)
-            else:
-                response = self.get_localized_text('missing_location')
-                    
-        elif intent == "get_advice":
-            if crop:
-                response = self.get_agriculture_advice(crop)
-            else:
-                response = self.get_localized_text('missing_crop')
-        
-        elif intent == "get_variety_info":
-            if crop:
-                response = self.get_crop_variety_info(crop)
-            else:
-                response = self.get_localized_text('missing_crop')
-        
-        elif intent == "get_market_info":
-            if location:
-                response = self.get_market_info(location)
-            else:
-                response = self.get_localized_text('missing_location')
-                    
-        elif intent == "greeting":
-            response = self.get_localized_text('greeting')
-                
-        else:
-            if self.current_language == 'hindi':
-                response = "क्षमा करें, मैं केवल कीमतों, मौसम, कृषि सलाह, किस्मों और बाजार जानकारी के बारे में मदद कर सकता हूं"
-            else:
-                response = "I can help with prices, weather, agricultural advice, variety information, and market details. Please try again."
+        handler = self.intent_handlers.get(intent, self.handle_unknown)
+        response = handler(crop, location, variety)
         
         # Update conversation context
         self.update_conversation_context(intent, crop, location, text, response)
         
         return response
 
+    def handle_price(self, crop, location, variety):
+        """Answer a price query, or ask for whatever is missing"""
+        if crop and location:
+            return self.response_cache(self.get_crop_price, self.current_language, crop, location, variety)
+        if not crop:
+            return self.get_localized_text('missing_crop')
+        return self.get_localized_text('missing_location')
+    
+    def handle_weather(self, crop, location, variety):
+        """Answer a weather query for the location"""
+        if location:
+            return self.response_cache(self.get_weather_info, self.current_language, location)
+        return self.get_localized_text('missing_location')
+    
+    def handle_advice(self, crop, location, variety):
+        """Answer an advice query for the crop"""
+        if crop:
+            return self.response_cache(self.get_agriculture_advice, self.current_language, crop)
+        return self.get_localized_text('missing_crop')
+    
+    def handle_variety_info(self, crop, location, variety):
+        """Answer a variety query for the crop"""
+        if crop:
+            return self.response_cache(self.get_crop_variety_info, self.current_language, crop)
+        return self.get_localized_text('missing_crop')
+    
+    def handle_market_info(self, crop, location, variety):
+        """Answer a market query for the location"""
+        if location:
+            return self.response_cache(self.get_market_info, self.current_language, location)
+        return self.get_localized_text('missing_location')
+    
+    def handle_greeting(self, crop, location, variety):
+        """Reply to a greeting"""
+        return self.get_localized_text('greeting')
+    
+    def handle_unknown(self, crop, location, variety):
+        """Reply to an intent the assistant has no answer for"""
+        if self.current_language == 'hindi':
+            return "क्षमा करें, मैं केवल कीमतों, मौसम, कृषि सलाह, किस्मों और बाजार जानकारी के बारे में मदद कर सकता हूं"
+        else:
+            return "I can help with prices, weather, agricultural advice, variety information, and market details. Please try again."
+
     def run(self):
         """Main loop for the assistant"""
         print("Agricultural Voice Assistant v5 Started!")
@@ -1045,31 +1373,28 @@ class AgriculturalAssistantV5:
         
         # Initial greeting
         greeting = self.get_localized_text('greeting')
-        print(f"Assistant: {greeting}")
-        self.tts_engine.say(greeting)
-        self.tts_engine.runAndWait()
+        self.speak_response(greeting)
         
         while True:
             try:
                 user_input = input("\n> ")
+                user_lower = user_input.lower()
                 
-                if user_input.lower() in ['quit', 'exit', 'बंद']:
+                if user_lower.strip() in EXIT_WORDS:
                     goodbye_text = self.get_localized_text('goodbye')
                     self.speak_response(goodbye_text)
                     break
                     
                 # Use speech recognition if user pressed Enter without typing
                 if user_input == "":
-                    user_text = self.listen_to_speech()
-                    if any(user_text.startswith(prefix) for prefix in [
-                        "Sorry", "No speech", "क्षमा", "कोई भाषण"
-                    ]):
-                        self.speak_response(user_text)
+                    status, user_text = self.listen_to_speech()
+                    if status != 'ok':
+                        self.speak_response(self.get_localized_text(status))
                         continue
                 else:
                     user_text = user_input
                     # Detect language from text input
-                    self.current_language = self.detect_language(user_text)
+                    self.current_language = self.detect_language(user_lower)
                     print(f"Detected language: {self.current_language}")
                 
                 # Process the query
@@ -1094,7 +1419,75 @@ class AgriculturalAssistantV5:
         
         # Save conversation history before exiting
         self.save_conversation_history()
+        
+        # Let any queued speech finish before exiting
+        self.tts_executor.shutdown(wait=True)
+
+    def run_hands_free(self):
+        """Main loop driven only by voice, listening continuously in the background"""
+        print("Agricultural Voice Assistant v5 Started (hands-free)!")
+        print("Available crops: wheat, rice, tomato, potato, maize, sugarcane, tur, gram, urd, millet, jaggery, cucumber, chilli, lemon, pumpkin")
+        print("Available locations: andhra pradesh, chittor, krishna, kurnool, bihar, bhojpur, chandigarh, chattisgarh, patna, delhi, pune, bangalore, mumbai, kolkata")
+        print("Speak your query, or say 'stop' to exit...")
+        
+        greeting = self.get_localized_text('greeting')
+        self.speak_response(greeting)
+        
+        microphone = sr.Microphone()
+        with microphone as source:
+            self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+        self.recognizer.dynamic_energy_threshold = True
+        self.noise_calibrated = True
+        # The listener thread records the next utterance while this one is recognized and
+        # answered, so recognition and speech overlap with capture instead of waiting for Enter
+        stop_listening = self.recognizer.listen_in_background(microphone, self.on_audio, phrase_time_limit=5)
+        print(self.get_localized_text('listening'))
+        
+        while True:
+            try:
+                audio = self.audio_queue.get()
+                try:
+                    user_text = self.recognizer.recognize_google(audio)
+                except sr.UnknownValueError:
+                    # Background noise or an unclear utterance; keep listening
+                    continue
+                except sr.RequestError:
+                    self.speak_response(self.get_localized_text('service_unavailable'))
+                    continue
+                print(f"You said: {user_text}")
+                
+                self.current_language = self.detect_language(user_text.lower())
+                print(f"Detected language: {self.current_language}")
+                
+                response = self.process_query(user_text)
+                
+                if response == "exit":
+                    goodbye_text = self.get_localized_text('goodbye')
+                    self.speak_response(goodbye_text)
+                    break
+                    
+                self.speak_response(response)
+                
+            except KeyboardInterrupt:
+                goodbye_text = self.get_localized_text('goodbye')
+                self.speak_response(goodbye_text)
+                break
+            except Exception as e:
+                print(f"Error: {e}")
+                error_msg = self.get_localized_text('error')
+                self.speak_response(error_msg)
+        
+        stop_listening(wait_for_stop=False)
+        
+        # Save conversation history before exiting
+        self.save_conversation_history()
+        
+        # Let any queued speech finish before exiting
+        self.tts_executor.shutdown(wait=True)
 
 if __name__ == "__main__":
     assistant = AgriculturalAssistantV5()
-    assistant.run()
\ No newline at end of file
+    if "--hands-free" in sys.argv:
+        assistant.run_hands_free()
+    else:
+        assistant.run()
\ No newline at end of file
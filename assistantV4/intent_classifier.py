@@ -1,9 +1,19 @@
 # ml_model/intent_classifier.py
 import pandas as pd
+import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 import joblib
+import re
+from collections import Counter
+
+# Fallback keywords from v3, in priority order
+FALLBACK_KEYWORDS = [
+    ("get_price", ['price', 'cost', 'rate', 'bhav']),
+    ("get_weather", ['weather', 'rain', 'temperature']),
+    ("get_advice", ['disease', 'pest', 'problem', 'advice'])
+]
 
 class IntentClassifier:
     def __init__(self):
@@ -11,6 +21,12 @@ class IntentClassifier:
         self.model = LogisticRegression()
         self.classes = ['get_price', 'get_weather', 'get_advice', 'greeting', 'unknown']
         
+        # Keyword -> priority, matched in one pass by a single longest-first alternation
+        self.fallback_ranks = {keyword: rank for rank, (intent, keywords) in enumerate(FALLBACK_KEYWORDS)
+                               for keyword in keywords}
+        alternation = '|'.join(re.escape(k) for k in sorted(self.fallback_ranks, key=len, reverse=True))
+        self.fallback_pattern = re.compile(alternation)
+        
     def train(self, training_data_path):
         # Load and preprocess training data
         df = pd.read_csv(training_data_path)
@@ -20,36 +36,69 @@ class IntentClassifier:
         # Train the model
         self.model.fit(X, y)
         
-        # Save the model
-        joblib.dump(self.vectorizer, 'models/vectorizer.joblib')
-        joblib.dump(self.model, 'models/intent_classifier.joblib')
+        # Save the model uncompressed, so load_model can memory-map its arrays
+        joblib.dump(self.vectorizer, 'models/vectorizer.joblib', compress=0)
+        joblib.dump(self.model, 'models/intent_classifier.joblib', compress=0)
+        self.prepare_scoring()
         
     def load_model(self):
-        self.vectorizer = joblib.load('models/vectorizer.joblib')
-        self.model = joblib.load('models/intent_classifier.joblib')
+        # The arrays are memory-mapped, so they are paged in on demand rather than copied
+        self.vectorizer = joblib.load('models/vectorizer.joblib', mmap_mode='r')
+        self.model = joblib.load('models/intent_classifier.joblib', mmap_mode='r')
+        self.prepare_scoring()
+        
+    def prepare_scoring(self):
+        # Pull what predict needs out of the fitted vectorizer and model once, so a query
+        # is scored without building a sparse matrix or going through sklearn's wrappers
+        self.analyzer = self.vectorizer.build_analyzer()
+        self.vocabulary = self.vectorizer.vocabulary_
+        self.idf = np.asarray(self.vectorizer.idf_, dtype=np.float64)
+        # The classifier's weights as terms x classes, so a query only touches the rows of
+        # the terms it contains
+        coef, intercept = self.model.coef_, self.model.intercept_
+        if coef.shape[0] == 1:
+            # Two intents: sklearn keeps one weight row, for the second class, and predict_proba
+            # is the sigmoid of its score, which is the softmax of [0, score]
+            coef = np.vstack([np.zeros_like(coef), coef])
+            intercept = np.concatenate([[0.0], intercept])
+        self.term_coef = np.ascontiguousarray(coef.T)
+        self.intercept = np.asarray(intercept)
         
     def predict(self, text):
-        # Transform text using the trained vectorizer
-        text_vec = self.vectorizer.transform([text])
+        # Count the known terms, then weight them as the TF-IDF vectorizer would
+        counts = Counter(self.vocabulary[term] for term in self.analyzer(text) if term in self.vocabulary)
+        terms = np.fromiter(counts, dtype=np.intp, count=len(counts))
+        weights = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        if self.vectorizer.sublinear_tf:
+            weights = np.log(weights) + 1.0
+        weights *= self.idf[terms]
+        if self.vectorizer.norm == 'l2' and len(weights):
+            weights /= np.sqrt(weights @ weights)
+        elif self.vectorizer.norm == 'l1' and len(weights):
+            weights /= np.abs(weights).sum()
         
-        # Predict intent
-        prediction = self.model.predict(text_vec)
-        probability = self.model.predict_proba(text_vec).max()
+        # Logistic regression: softmax of the linear scores (of [0, score] for two intents)
+        scores = weights @ self.term_coef[terms] + self.intercept
+        probabilities = np.exp(scores - scores.max())
+        probabilities /= probabilities.sum()
+        best = probabilities.argmax()
+        probability = probabilities[best]
         
         # Fall back to rule-based if confidence is low
         if probability < 0.6:
             return self.rule_based_fallback(text)
         
-        return prediction[0], probability
+        return self.model.classes_[best], probability
     
     def rule_based_fallback(self, text):
         # Fallback to the rule-based classifier from v3
-        text = text.lower()
-        if any(word in text for word in ['price', 'cost', 'rate', 'bhav']):
-            return "get_price", 0.5
-        elif any(word in text for word in ['weather', 'rain', 'temperature']):
-            return "get_weather", 0.5
-        elif any(word in text for word in ['disease', 'pest', 'problem', 'advice']):
-            return "get_advice", 0.5
-        else:
-            return "unknown", 0.5
\ No newline at end of file
+        # One pass over the text, keeping the highest-priority intent whose keyword appears
+        best_rank = len(FALLBACK_KEYWORDS)
+        for match in self.fallback_pattern.finditer(text.lower()):
+            best_rank = min(best_rank, self.fallback_ranks[match.group()])
+            if best_rank == 0:
+                break
+        
+        if best_rank < len(FALLBACK_KEYWORDS):
+            return FALLBACK_KEYWORDS[best_rank][0], 0.5
+        return "unknown", 0.5
@@ -63,6 +63,9 @@ training_data = [
     ("टमाटर की सलाह", "get_advice")
 ]
 
+# Drop repeated examples (keeping the first of each) so they don't weigh twice in training
+training_data = list(dict.fromkeys(training_data))
+
 # Create DataFrame
 df = pd.DataFrame(training_data, columns=['text', 'intent'])
 
@@ -78,4 +81,8 @@ model.fit(X, df['intent'])
 joblib.dump(vectorizer, 'models/vectorizer.joblib')
 joblib.dump(model, 'models/intent_classifier.joblib')
 
+# Both in one uncompressed bundle too, so the assistant can load them with a single
+# memory-mapped joblib.load (mmap only works on uncompressed files)
+joblib.dump({'vectorizer': vectorizer, 'classifier': model}, 'models/intent_bundle.joblib', compress=0)
+
 print("Model trained and saved successfully")
\ No newline at end of file
@@ -0,0 +1,50 @@
+# nlp_loader.py
+# Shared spaCy pipelines for assistantV1/V2.
+# Each pipeline is built once per process and handed to every caller, so importing
+# several assistants never loads the same model twice. For multi-process deployments,
+# call these in the parent process before forking workers: the read-only model pages
+# are then shared copy-on-write instead of being loaded again by every worker.
+
+import os
+import threading
+import spacy
+
+# Trimmed bundle written by prepare_nlp_model.py
+TRIMMED_MODEL_PATH = "models/en_core_web_sm_trimmed"
+
+_pipelines = {}
+_lock = threading.Lock()
+
+def _shared(key, build):
+    """Return the pipeline stored under key, building it on first use"""
+    with _lock:
+        if key not in _pipelines:
+            _pipelines[key] = build()
+    return _pipelines[key]
+
+def _build_tagger():
+    # Only token.pos_ is used, so the parser, NER and lemmatizer are not loaded.
+    # attribute_ruler stays enabled: it is what maps the tagger's tags onto token.pos_.
+    # Prefer the trimmed bundle, which loads faster.
+    if os.path.exists(TRIMMED_MODEL_PATH):
+        return spacy.load(TRIMMED_MODEL_PATH)
+    return spacy.load("en_core_web_sm", disable=["parser", "ner", "lemmatizer"])
+
+def get_tagger():
+    """Statistical POS-tagging pipeline (used by assistantV1)"""
+    return _shared("tagger", _build_tagger)
+
+def _build_entity_ruler(crops, locations):
+    # Rule-only pipeline: blank English tokenizer + case-insensitive EntityRuler.
+    # Nothing is loaded from disk and each query is tagged by token-hash matching.
+    nlp = spacy.blank("en")
+    ruler = nlp.add_pipe("entity_ruler", config={"phrase_matcher_attr": "LOWER"})
+    ruler.add_patterns([{"label": "GPE", "pattern": loc} for loc in locations] +
+                       [{"label": "CROP", "pattern": crop} for crop in crops])
+    return nlp
+
+def get_entity_ruler(crops, locations):
+    """Rule-based pipeline tagging known locations as GPE and crops as CROP (used by assistantV2)"""
+    crops, locations = tuple(crops), tuple(locations)
+    return _shared(("entity_ruler", crops, locations),
+                   lambda: _build_entity_ruler(crops, locations))
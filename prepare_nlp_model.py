@@ -0,0 +1,13 @@
+# prepare_nlp_model.py
+# One-time setup: saves a trimmed copy of en_core_web_sm for assistantV1.
+# Only POS tags are used, so the parser, NER and lemmatizer are excluded before saving;
+# loading the trimmed bundle then skips reading their weights entirely.
+# Run once from this directory: python prepare_nlp_model.py
+
+import spacy
+from nlp_loader import TRIMMED_MODEL_PATH
+
+nlp = spacy.load("en_core_web_sm", exclude=["parser", "ner", "lemmatizer"])
+nlp.to_disk(TRIMMED_MODEL_PATH)
+
+print(f"Trimmed model with pipes {nlp.pipe_names} saved to {TRIMMED_MODEL_PATH}")